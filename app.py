@@ -1,23 +1,45 @@
 import streamlit as st
-import pandas as pd
-from scraper import run_scraper
-from db import client
-import plotly.express as px
-
-def load_data(year, team, stat_category):
-    """Load data from the correct season's database and collection."""
-    db_name = f"football_{year}"
-    collection_name = f"{team}_{stat_category}_{year}"
-    db = client[db_name]  
-    collection = db[collection_name]
-
-    data = list(collection.find())
-    if data:
-        # Convert ObjectId to string for display
-        for record in data:
-            record['_id'] = str(record['_id'])
-        return pd.DataFrame(data)
-    return None
+import jobs
+from db import load_matchlogs_frame, get_data_version, bump_data_version
+from scrapers.squads import SQUAD_IDS
+
+# The ttl only bounds staleness for data written by other processes (e.g. the scheduler)
+@st.cache_data(show_spinner=False, max_entries=256, ttl=15 * 60)
+def _load_data_cached(year, team, stat_category, data_version, columns=None):
+    return load_matchlogs_frame(team, stat_category, year, year, columns=columns)
+
+def load_data(year, team, stat_category, columns=None):
+    """Load data from the correct season's database and collection.
+
+    Only the requested columns are fetched, and the result is typed and cached
+    in memory until run_scraper writes new data for the key.
+    """
+    columns = tuple(columns) if columns else None
+    return _load_data_cached(year, team, stat_category,
+                             get_data_version(year, team, stat_category), columns)
+
+def show_job_progress():
+    """Show the status of the jobs queued from this session and reload data they changed."""
+    job_ids = st.session_state.get("job_ids", [])
+    if not job_ids:
+        return
+
+    job_rows = jobs.get_jobs(job_ids)
+    acknowledged = st.session_state.setdefault("acknowledged_jobs", set())
+    for job in job_rows:
+        if job["status"] == "done" and job["id"] not in acknowledged:
+            # The worker runs in another process, so invalidate our cached copy here
+            bump_data_version(job["season"], job["team"], job["stat_category"])
+            acknowledged.add(job["id"])
+
+    pending = sum(1 for job in job_rows if job["status"] in jobs.ACTIVE_STATUSES)
+    st.sidebar.progress(1 - pending / len(job_rows),
+                        text=f"{len(job_rows) - pending}/{len(job_rows)} scrape jobs finished")
+    failed = [job for job in job_rows if job["status"] == "failed"]
+    for job in failed:
+        st.sidebar.error(f"{job['team']} {job['stat_category']}: {job['error']}")
+    if pending and st.sidebar.button("Refresh status"):
+        st.rerun()
 
 def main():
     st.title("La Liga Scraping Dashboard")
@@ -42,12 +64,19 @@ def main():
 
     selected_tab = st.sidebar.radio("Select Stats Category", list(collection_mapping.keys()))
 
+    with st.sidebar.expander("Scrape more teams and categories"):
+        scrape_teams = st.multiselect("Teams", list(SQUAD_IDS),
+                                      default=[selected_team] if selected_team in SQUAD_IDS else [])
+        scrape_tabs = st.multiselect("Categories", list(collection_mapping.keys()), default=[selected_tab])
+
     if st.sidebar.button("Scrape Data"):
-        stat_category = collection_mapping[selected_tab]
-        with st.spinner(f"Scraping {selected_tab} data for {selected_team} in {selected_year}..."):
-            run_scraper(selected_year, selected_team, stat_category, selected_year)
-            st.success(f"Data for {selected_team} ({selected_year}) updated successfully!")
-            st.rerun()
+        teams = scrape_teams or [selected_team]
+        categories = [collection_mapping[tab] for tab in scrape_tabs or [selected_tab]]
+        job_ids = jobs.enqueue_many(selected_year, teams, categories)
+        st.session_state["job_ids"] = list(dict.fromkeys(st.session_state.get("job_ids", []) + job_ids))
+        st.sidebar.info(f"Queued {len(job_ids)} scrape jobs. Start a worker with `python worker.py`.")
+
+    show_job_progress()
 
     # Fetch and display data from MongoDB
     st.header(selected_tab)
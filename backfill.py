@@ -0,0 +1,300 @@
+"""Load historical seasons as a streaming pipeline: fetch -> parse -> normalize -> bulk write.
+
+Usage:
+    python backfill.py 2009-2010 2010-2011 ...
+    python backfill.py --from 2009 --to 2024 [--competitions laliga premierleague] [--include-against]
+
+Jobs are generated lazily and flow through bounded queues, so memory stays
+flat however many seasons are requested: a stage that falls behind makes
+the ones before it wait. Parsing and normalizing, the CPU-bound part, runs
+on a pool of processes so it uses every core. Every finished job is appended
+to a checkpoint file and skipped when the backfill is started again.
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+
+from db import update_data
+from scraper import AGAINST_SUFFIX, iter_jobs
+from scrapers.engine import category_url, process_table
+from scrapers.registry import get_category
+from utils import metrics
+from utils.frame_codec import decode_frame, encode_frame
+from utils.logging_config import configure_logging
+from utils.page_cache import fetch_page, get_default_cache
+from utils.scraper_utils import PARSE_WORKERS, retry_on_failure, start_parse_pool
+from utils.table_parser import parse_table
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_PATH = os.getenv("FBREF_BACKFILL_CHECKPOINT", ".backfill_checkpoint.jsonl")
+FETCH_WORKERS = int(os.getenv("FBREF_BACKFILL_FETCH_WORKERS", 2))
+# Items held between two stages; pages and tables beyond this wait upstream
+QUEUE_SIZE = int(os.getenv("FBREF_BACKFILL_QUEUE_SIZE", 4))
+
+_DONE = object()
+
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    """Return the (season, team, stat_category) jobs a previous backfill finished."""
+    done = set()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Last line of an interrupted run
+                if entry.get("status") == "done":
+                    done.add((entry["season"], entry["team"], entry["stat_category"]))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+class Checkpoint:
+    """Append-only record of finished jobs, flushed after every entry."""
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def record(self, job, status, rows=None, error=None):
+        season, team, stat_category = job
+        entry = {"season": season, "team": team, "stat_category": stat_category,
+                 "status": status, "rows": rows, "error": error, "at": time.time()}
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _split_against(stat_category):
+    if stat_category.endswith(AGAINST_SUFFIX):
+        return stat_category[:-len(AGAINST_SUFFIX)], "matchlogs_against"
+    return stat_category, None
+
+
+@retry_on_failure(max_retries=3, delay=5)
+def _fetch(url):
+    return fetch_page(url)
+
+
+def _fetch_stage(jobs, pages, failures, stop):
+    for job in jobs:
+        if stop.is_set():
+            break
+        season, team, stat_category = job
+        try:
+            url = category_url(_split_against(stat_category)[0], season, team)
+            pages.put((job, url, _fetch(url)))
+        except Exception as e:
+            failures.put((job, e))
+
+
+def parse_job(page, job):
+    """Parse and normalize one job's page; runs in a pool process.
+
+    Returns the table packed with encode_frame and the time it took, since
+    metrics recorded in the pool process would not reach the backfill's.
+    """
+    start = time.perf_counter()
+    season, team, stat_category = job
+    base_category, table_id = _split_against(stat_category)
+    _, spec = get_category(base_category)
+    df = process_table(parse_table(page, table_id or spec.table_id), spec, season, team)
+    return encode_frame(df), time.perf_counter() - start
+
+
+def _deliver(job, url, parse, tables, failures):
+    try:
+        packed, elapsed = parse()
+        metrics.observe("fbref_stage_duration_seconds", elapsed, stage="parse_normalize")
+        tables.put((job, url, decode_frame(packed)))
+    except Exception as e:
+        failures.put((job, e))
+
+
+def _parse_stage(pages, tables, failures, parse_workers=0, max_in_flight=1, pools=None):
+    """Hand pages to the pool, keeping at most max_in_flight parses queued so results come back in order.
+
+    Runs until pages yields _DONE whatever fails, so the fetch threads never
+    block on a full queue. A pool broken by a dead process (OOM kill, crash
+    in lxml) fails the jobs it held and is replaced by a fresh one. Every
+    pool started is appended to `pools` so the caller can shut it down.
+    """
+    pools = [] if pools is None else pools
+
+    def start_pool():
+        pools.append(start_parse_pool(parse_workers))
+        return pools[-1]
+
+    executor = start_pool() if parse_workers > 0 else None
+    in_flight = deque()
+
+    def drain(limit):
+        while len(in_flight) > limit:
+            job, url, future = in_flight.popleft()
+            _deliver(job, url, future.result, tables, failures)
+
+    try:
+        while True:
+            item = pages.get()
+            if item is _DONE:
+                break
+            job, url, page = item
+            if executor is None:
+                _deliver(job, url, lambda: parse_job(page, job), tables, failures)
+                continue
+            try:
+                in_flight.append((job, url, executor.submit(parse_job, page, job)))
+            except BrokenProcessPool as e:
+                failures.put((job, e))
+                drain(0)
+                logger.warning("Parse pool broke; starting a new one")
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = start_pool()
+                continue
+            drain(max_in_flight - 1)
+        drain(0)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_backfill(seasons, teams=None, categories=None, competitions=None, include_against=False,
+                 fetch_workers=FETCH_WORKERS, queue_size=QUEUE_SIZE, checkpoint_path=CHECKPOINT_PATH,
+                 parse_workers=PARSE_WORKERS):
+    """Stream every job through the pipeline; returns counts of done, failed and skipped jobs.
+
+    Fetch threads feed a dispatcher thread that parses on `parse_workers`
+    processes, which feeds the writer (this thread). Everything is written
+    with update_data, so re-loading an unchanged season costs no writes.
+    """
+    finished = load_checkpoint(checkpoint_path)
+    checkpoint = Checkpoint(checkpoint_path)
+    counts = {"done": 0, "failed": 0, "skipped": 0}
+
+    def pending_jobs():
+        for job in iter_jobs(seasons, teams, categories, competitions, include_against):
+            if job in finished:
+                counts["skipped"] += 1
+                continue
+            yield job
+
+    jobs = pending_jobs()
+    jobs_lock = threading.Lock()
+
+    def next_jobs():
+        while True:
+            with jobs_lock:
+                job = next(jobs, None)
+            if job is None:
+                return
+            yield job
+
+    pages = queue.Queue(maxsize=queue_size)
+    tables = queue.Queue(maxsize=queue_size)
+    failures = queue.Queue()
+    stop = threading.Event()
+    pools = []
+
+    fetchers = [threading.Thread(target=_fetch_stage, args=(next_jobs(), pages, failures, stop), daemon=True)
+                for _ in range(fetch_workers)]
+    parser = threading.Thread(target=_parse_stage, daemon=True,
+                              args=(pages, tables, failures, parse_workers, max(parse_workers * 2, 1), pools))
+    for thread in fetchers + [parser]:
+        thread.start()
+
+    def close_stages():
+        for thread in fetchers:
+            thread.join()
+        pages.put(_DONE)
+        parser.join()
+        tables.put(_DONE)
+
+    threading.Thread(target=close_stages, daemon=True).start()
+    cache = get_default_cache()
+
+    def record_failures():
+        while not failures.empty():
+            job, error = failures.get()
+            logger.error(f"Backfill job {job} failed: {error}")
+            checkpoint.record(job, "failed", error=str(error))
+            counts["failed"] += 1
+
+    try:
+        while True:
+            item = tables.get()
+            record_failures()
+            if item is _DONE:
+                break
+            job, url, df = item
+            season, team, stat_category = job
+            try:
+                update_data(df, season, team, stat_category, season, validators=cache.validators(url))
+                checkpoint.record(job, "done", rows=len(df))
+                counts["done"] += 1
+            except Exception as e:
+                failures.put((job, e))
+            del df
+        record_failures()
+    except KeyboardInterrupt:
+        stop.set()
+        print("⏹️ Backfill interrupted; run it again to resume from the checkpoint")
+        raise
+    finally:
+        checkpoint.close()
+        for executor in pools:
+            executor.shutdown(wait=False, cancel_futures=True)
+        metrics.write_file()
+
+    print(f"✅ Backfill finished: {counts['done']} jobs loaded, {counts['failed']} failed, "
+          f"{counts['skipped']} already done")
+    return counts
+
+
+def _season_range(first, last):
+    return [f"{year}-{year + 1}" for year in range(first, last)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("seasons", nargs="*", help="Seasons to load, e.g. 2009-2010")
+    parser.add_argument("--from", dest="first", type=int, help="First season's start year")
+    parser.add_argument("--to", dest="last", type=int, help="Last season's end year")
+    parser.add_argument("--teams", nargs="+")
+    parser.add_argument("--categories", nargs="+", help='Kinds ("shooting") or full names')
+    parser.add_argument("--competitions", nargs="+")
+    parser.add_argument("--include-against", action="store_true")
+    parser.add_argument("--fetch-workers", type=int, default=FETCH_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                        help="Parsing processes (0 parses in this process)")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    seasons = list(args.seasons)
+    if args.first and args.last:
+        seasons += _season_range(args.first, args.last)
+    if not seasons:
+        parser.error("give seasons or --from/--to")
+
+    configure_logging()
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    run_backfill(seasons, args.teams, args.categories, args.competitions, args.include_against,
+                 args.fetch_workers, args.queue_size, args.checkpoint, args.parse_workers)
+
+
+if __name__ == "__main__":
+    main()
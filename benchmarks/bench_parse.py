@@ -0,0 +1,76 @@
+"""Compare per-page parse time and peak memory of pd.read_html and the lxml table extractor.
+
+Usage:
+    python benchmarks/bench_parse.py PAGE [PAGE ...] [--table-id matchlogs_for] [--repeat 20]
+
+PAGE is either a saved HTML file or a URL (fetched once through the page cache).
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from io import StringIO
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from utils.page_cache import fetch_page
+from utils.table_parser import parse_table
+
+
+def load_page(source):
+    if source.startswith(("http://", "https://")):
+        return fetch_page(source)
+    with open(source, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def read_html_parser(page, table_id):
+    return pd.read_html(StringIO(page), attrs={'id': table_id})[0]
+
+
+def lxml_parser(page, table_id):
+    return parse_table(page, table_id)
+
+
+def measure(parser, page, table_id, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser(page, table_id)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parser(page, table_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return timings[len(timings) // 2], peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="+")
+    parser.add_argument("--table-id", default="matchlogs_for")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'page':<40} {'parser':<12} {'median ms':>10} {'peak KiB':>10}")
+    for source in args.pages:
+        page = load_page(source)
+
+        expected = read_html_parser(page, args.table_id)
+        actual = lxml_parser(page, args.table_id)
+        if not expected.columns.equals(actual.columns) or expected.shape != actual.shape:
+            print(f"⚠️ Parsers disagree on {source}: {expected.shape} vs {actual.shape}")
+
+        for name, func in (("read_html", read_html_parser), ("lxml", lxml_parser)):
+            median, peak = measure(func, page, args.table_id, args.repeat)
+            print(f"{os.path.basename(source)[-40:]:<40} {name:<12} {median * 1000:>10.2f} {peak / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Time the scrape pipeline stage by stage against local fixtures, without FBref or a live MongoDB.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--teams 1 | --league] [--mongo mongomock | --mongo mongodb://...]
+                                        [--latency-ms 0] [--trace-memory] [--json results.json]
+
+Every stat category page of the selected teams is served by the fixture
+server (benchmarks/fixtures.py). Stages run one after the other over all
+pages so each is measured on its own: fetch (HTTP + page cache), parse
+(table extraction), transform (column rules, dtypes, canonical schema) and
+write (update_data). An end-to-end run_all_scrapers pass follows.
+
+Writes go to an in-memory mongomock database by default (pip install
+mongomock), emptied before the end-to-end pass so both passes insert. Only
+point --mongo at a scratch server: the pipeline writes to its usual
+databases there, and the end-to-end pass finds the data the stage pass just
+wrote, so it measures the unchanged-table path.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import socket
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def configure(port, mongo, workdir):
+    """Point the scraper at the fixture server and a scratch cache; must run before importing it."""
+    os.environ.update({
+        "FBREF_BASE_URL": f"http://127.0.0.1:{port}",
+        "FBREF_CACHE_DIR": os.path.join(workdir, "page_cache"),
+        "FBREF_SQUAD_INDEX": os.path.join(workdir, "squad_index.json"),
+        "FBREF_REQUESTS_PER_MINUTE": "1000000",
+        "FBREF_BURST": "1000",
+        "FBREF_MAX_CONNECTIONS_PER_HOST": "16",
+    })
+    if mongo == "mongomock":
+        import mongomock
+        import pymongo
+        pymongo.MongoClient = mongomock.MongoClient
+    else:
+        os.environ["MONGO_URI"] = mongo
+
+
+def rss_mib():
+    """High-water resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Stage:
+    def __init__(self, name, trace_memory):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.timings = []
+        self.traced_peak = 0
+        self.rss = 0
+
+    def __enter__(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        return self
+
+    def time(self, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.timings.append(time.perf_counter() - start)
+        return result
+
+    def __exit__(self, *exc):
+        if self.trace_memory:
+            self.traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.rss = rss_mib()
+        return False
+
+    def summary(self):
+        timings = sorted(self.timings)
+        return {
+            "stage": self.name,
+            "calls": len(timings),
+            "total_s": sum(timings),
+            "median_ms": timings[len(timings) // 2] * 1000 if timings else 0,
+            "p95_ms": timings[int(len(timings) * 0.95)] * 1000 if timings else 0,
+            "rss_mib": self.rss,
+            "traced_peak_kib": self.traced_peak / 1024,
+        }
+
+
+def run_stages(season, teams, trace_memory):
+    from db import update_data
+    from scrapers.engine import apply_dtypes, category_url, trim_columns
+    from scrapers.registry import CATEGORIES, get_category
+    from scrapers.schema import normalize
+    from utils.page_cache import fetch_page
+    from utils.table_parser import parse_table
+
+    jobs = [(team, stat_category) for team in teams for stat_category in CATEGORIES]
+    stages = []
+
+    with Stage("fetch", trace_memory) as stage:
+        pages = [stage.time(fetch_page, category_url(stat_category, season, team))
+                 for team, stat_category in jobs]
+    stages.append(stage)
+
+    with Stage("parse", trace_memory) as stage:
+        tables = [stage.time(parse_table, page, get_category(stat_category)[1].table_id)
+                  for page, (_, stat_category) in zip(pages, jobs)]
+    stages.append(stage)
+    del pages
+
+    def transform(df, spec):
+        df = trim_columns(df, spec).iloc[:-1]
+        return normalize(apply_dtypes(df.reset_index(drop=True), spec))
+
+    with Stage("transform", trace_memory) as stage:
+        frames = [stage.time(transform, df, get_category(stat_category)[1])
+                  for df, (_, stat_category) in zip(tables, jobs)]
+    stages.append(stage)
+    del tables
+
+    with Stage("write", trace_memory) as stage:
+        for df, (team, stat_category) in zip(frames, jobs):
+            stage.time(update_data, df, season, team, stat_category, season)
+    stages.append(stage)
+
+    return stages
+
+
+def run_end_to_end(season, teams, trace_memory):
+    """Scrape everything again through run_all_scrapers; force revalidates every cached page."""
+    from scraper import run_all_scrapers
+
+    with Stage("end_to_end", trace_memory) as stage:
+        stage.time(run_all_scrapers, season, teams=teams, force=True)
+    return stage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--season", default="2023-2024")
+    parser.add_argument("--teams", type=int, default=1, help="Number of La Liga teams to scrape")
+    parser.add_argument("--league", action="store_true", help="Scrape every team of the league")
+    parser.add_argument("--mongo", default="mongomock", help='"mongomock" or a MongoDB URI')
+    parser.add_argument("--latency-ms", type=float, default=0, help="Simulated server latency")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also report tracemalloc peaks (slows every stage down)")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fbref_bench_")
+    port = _free_port()
+    configure(port, args.mongo, workdir)
+
+    import db
+    from fixtures import PAGE_LAYOUTS, saved_pages, start_server
+    from scrapers.squads import SQUAD_IDS
+
+    start_server(port, args.latency_ms / 1000)
+    teams = list(SQUAD_IDS) if args.league else list(SQUAD_IDS)[:args.teams]
+
+    print(f"🏁 Benchmarking {len(teams)} teams x 9 categories for {args.season} (storage: {args.mongo})")
+    saved = saved_pages()
+    if len(saved) < len(PAGE_LAYOUTS):
+        print(f"⚠️ {len(PAGE_LAYOUTS) - len(saved)} of {len(PAGE_LAYOUTS)} category pages are generated, not recorded "
+              f"(python benchmarks/fixtures.py record); they time the pipeline but can't catch FBref markup changes")
+    stages = run_stages(args.season, teams, args.trace_memory)
+    if args.mongo == "mongomock":
+        db.close_client()
+    stages.append(run_end_to_end(args.season, teams, args.trace_memory))
+
+    results = [stage.summary() for stage in stages]
+    print(f"\n{'stage':<12} {'calls':>6} {'total s':>9} {'median ms':>10} {'p95 ms':>9} "
+          f"{'RSS MiB':>9} {'traced KiB':>11}")
+    for row in results:
+        print(f"{row['stage']:<12} {row['calls']:>6} {row['total_s']:>9.2f} {row['median_ms']:>10.2f} "
+              f"{row['p95_ms']:>9.2f} {row['rss_mib']:>9.1f} {row['traced_peak_kib']:>11.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"season": args.season, "teams": len(teams), "mongo": args.mongo,
+                       "stages": results}, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Measure cold import time of the entry-point modules, each in a fresh interpreter.
+
+Usage:
+    python benchmarks/bench_startup.py [MODULE ...] [--repeat 5] [--top 8]
+
+Defaults to app, scraper, scheduler, jobs and db. For every module the median
+wall time of `python -c "import MODULE"` is reported with its heaviest
+imports (cumulative time from `python -X importtime`), and whether importing
+it already created a MongoDB client.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_MODULES = ["app", "scraper", "scheduler", "jobs", "db"]
+
+CLIENT_CHECK = "import sys; db = sys.modules.get('db'); print(bool(db and db._client is not None))"
+
+
+def time_import(module, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def heaviest_imports(module, top):
+    """Return (cumulative µs, package) of the slowest top-level imports made by the module."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, check=True, capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Direct imports of the module are indented by three spaces
+        if name.startswith("   ") and not name.startswith("    "):
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def creates_client(module):
+    result = subprocess.run([sys.executable, "-c", f"import {module}; {CLIENT_CHECK}"],
+                            cwd=ROOT, check=True, capture_output=True, text=True)
+    return result.stdout.strip().endswith("True")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    baseline = time_import("sys", args.repeat)
+    print(f"Interpreter start-up: {baseline * 1000:.0f} ms (subtracted below)\n")
+    for module in args.modules:
+        median = time_import(module, args.repeat) - baseline
+        client = "yes" if creates_client(module) else "no"
+        print(f"{module:<12} {median * 1000:>8.0f} ms   MongoClient at import: {client}")
+        for cumulative, name in heaviest_imports(module, args.top):
+            print(f"    {name:<32} {cumulative / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Match-log pages for offline benchmarks, and a local HTTP server that stands in for FBref.
+
+Usage:
+    python benchmarks/fixtures.py generate [--team Barcelona]
+    python benchmarks/fixtures.py record --team Barcelona --season 2023-2024
+    python benchmarks/fixtures.py serve [--port 8765] [--latency-ms 50]
+
+Recorded pages are stored as benchmarks/fixtures/<url path>.html, one per
+stat category page (shooting and goalshot share one). The server answers
+match-log URLs with the recorded page when there is one and a generated page
+otherwise, and competition pages with squad links built from scrapers/squads.py.
+`generate` writes its pages to benchmarks/generated/ for inspection, so they
+are never mistaken for recorded ones.
+
+No recorded pages are committed: they have to be fetched from FBref with
+`record`. Generated pages follow FBref's layout (two-row headers, the
+opponent table inside a comment, a totals footer) but are written for the
+parser, so they measure speed; only recorded pages catch changes in FBref's
+real markup.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scrapers.squads import SQUAD_IDS
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+GENERATED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generated")
+MATCHES_PER_SEASON = 38
+
+# Leading columns of every match-log table, grouped under "For <team>"
+MATCH_COLUMNS = ["Date", "Time", "Comp", "Round", "Day", "Venue", "Result", "GF", "GA", "Opponent"]
+
+# Header groups of each match-log page, keyed by the URL path of its category
+PAGE_LAYOUTS = {
+    "schedule": None,
+    "shooting": [
+        ("Standard", ["Gls", "Sh", "SoT", "SoT%", "G/Sh", "G/SoT", "Dist", "FK", "PK", "PKatt"]),
+        ("Expected", ["xG", "npxG", "npxG/Sh", "G-xG", "np:G-xG"]),
+    ],
+    "keeper": [
+        ("Performance", ["SoTA", "GA", "Saves", "Save%", "CS", "PSxG", "PSxG+/-"]),
+        ("Penalty Kicks", ["PKatt", "PKA", "PKsv", "PKm"]),
+        ("Launched", ["Cmp", "Att", "Cmp%"]),
+        ("Passes", ["Att (GK)", "Thr", "Launch%", "AvgLen"]),
+        ("Goal Kicks", ["Att", "Launch%", "AvgLen"]),
+        ("Crosses", ["Opp", "Stp", "Stp%"]),
+        ("Sweeper", ["#OPA", "AvgDist"]),
+    ],
+    "passing": [
+        ("Total", ["Cmp", "Att", "Cmp%", "TotDist", "PrgDist"]),
+        ("Short", ["Cmp", "Att", "Cmp%"]),
+        ("Medium", ["Cmp", "Att", "Cmp%"]),
+        ("Long", ["Cmp", "Att", "Cmp%"]),
+        ("", ["Ast", "xAG", "xA", "KP", "1/3", "PPA", "CrsPA", "PrgP"]),
+    ],
+    "passing_types": [
+        ("Pass Types", ["Att", "Live", "Dead", "FK", "TB", "Sw", "Crs", "TI", "CK"]),
+        ("Corner Kicks", ["In", "Out", "Str"]),
+        ("Outcomes", ["Cmp", "Off", "Blocks"]),
+    ],
+    "possession": [
+        ("Touches", ["Touches", "Def Pen", "Def 3rd", "Mid 3rd", "Att 3rd", "Att Pen", "Live"]),
+        ("Take-Ons", ["Att", "Succ", "Succ%", "Tkld", "Tkld%"]),
+        ("Carries", ["Carries", "TotDist", "PrgDist", "PrgC", "1/3", "CPA", "Mis", "Dis"]),
+        ("Receiving", ["Rec", "PrgR"]),
+    ],
+    # Err is column 24, where the defensive category's column rule expects it
+    "defense": [
+        ("Tackles", ["Tkl", "TklW", "Def 3rd", "Mid 3rd", "Att 3rd"]),
+        ("Challenges", ["Tkl", "Att", "Tkl%", "Lost"]),
+        ("Blocks", ["Blocks", "Sh", "Pass"]),
+        ("", ["Int", "Clr", "Err"]),
+    ],
+    "misc": [
+        ("Performance", ["CrdY", "CrdR", "2CrdY", "Fls", "Fld", "Off", "Crs", "Int", "TklW",
+                         "PKwon", "PKcon", "OG", "Recov"]),
+        ("Aerial Duels", ["Won", "Lost", "Won%"]),
+    ],
+}
+
+SCHEDULE_COLUMNS = MATCH_COLUMNS + ["xG", "xGA", "Poss", "Attendance", "Captain", "Formation",
+                                    "Opp Formation", "Referee", "Match Report", "Notes"]
+
+
+def fixture_path(url_path, directory=None):
+    return os.path.join(directory or FIXTURE_DIR, f"{url_path}.html")
+
+
+def _cell(header, rng, match):
+    if header in match:
+        return match[header]
+    if header in ("Captain", "Referee"):
+        return rng.choice(["A. Romero", "J. Martínez", "P. Gil", "C. del Cerro"])
+    if header in ("Formation", "Opp Formation"):
+        return rng.choice(["4-3-3", "4-4-2", "4-2-3-1", "3-5-2"])
+    if header == "Match Report":
+        return '<a href="/en/matches/0000/Match-Report">Match Report</a>'
+    if header == "Notes":
+        return ""
+    if header == "Attendance":
+        return f"{rng.randint(8000, 90000):,}"
+    if "%" in header or "/" in header or "x" in header or header in ("Dist", "AvgLen", "AvgDist", "Poss"):
+        return f"{rng.uniform(0, 100 if '%' in header or header == 'Poss' else 3):.1f}"
+    return str(rng.randint(0, 40))
+
+
+def _matches(team, season, rng):
+    start = date(int(season.split("-")[0]), 8, 13)
+    opponents = [name for name in SQUAD_IDS if name != team]
+    matches = []
+    for week in range(MATCHES_PER_SEASON):
+        gf, ga = rng.randint(0, 4), rng.randint(0, 4)
+        day = start + timedelta(days=7 * week)
+        matches.append({
+            "Date": f'<a href="/en/matches/{day}">{day}</a>',
+            "Time": rng.choice(["14:00", "16:15", "18:30", "21:00"]),
+            "Comp": "La Liga",
+            "Round": f"Matchweek {week + 1}",
+            "Day": day.strftime("%a"),
+            "Venue": "Home" if week % 2 == 0 else "Away",
+            "Result": "W" if gf > ga else "L" if gf < ga else "D",
+            "GF": str(gf),
+            "GA": str(ga),
+            "Opponent": opponents[week % len(opponents)],
+        })
+    return matches
+
+
+def _table(table_id, team_label, layout, matches, rng):
+    if layout is None:
+        headers = SCHEDULE_COLUMNS
+        over_header = ""
+    else:
+        headers = MATCH_COLUMNS + [name for _, names in layout for name in names] + ["Match Report"]
+        groups = [(team_label, len(MATCH_COLUMNS))] + [(group, len(names)) for group, names in layout]
+        groups.append(("", 1))
+        over_header = '<tr class="over_header">%s</tr>' % "".join(
+            f'<th colspan="{span}" class="over_header center">{group}</th>' for group, span in groups
+        )
+
+    header_row = "<tr>%s</tr>" % "".join(f'<th scope="col">{name}</th>' for name in headers)
+    rows = []
+    for match in matches:
+        cells = [_cell(name, rng, match) for name in headers]
+        rows.append('<tr><th scope="row">%s</th>%s</tr>' % (cells[0], "".join(f"<td>{c}</td>" for c in cells[1:])))
+    totals = '<tr><th scope="row"></th>%s</tr>' % "".join(
+        f"<td>{_cell(name, rng, {}) if i >= len(MATCH_COLUMNS) else ''}</td>"
+        for i, name in enumerate(headers[1:], start=1)
+    )
+    return (f'<table class="stats_table" id="{table_id}"><thead>{over_header}{header_row}</thead>'
+            f'<tbody>{"".join(rows)}</tbody><tfoot>{totals}</tfoot></table>')
+
+
+def generate_page(url_path, team="Barcelona", season="2023-2024", seed=0):
+    """Build a match-log page shaped like FBref's: team table inline, opponent table in a comment."""
+    rng = random.Random(f"{seed}:{url_path}:{team}:{season}")
+    layout = PAGE_LAYOUTS[url_path]
+    matches = _matches(team, season, rng)
+    tables = _table("matchlogs_for", f"For {team}", layout, matches, rng)
+    if layout is not None:
+        against = _table("matchlogs_against", f"Against {team}", layout, matches, rng)
+        tables += f'<div class="placeholder"></div><!--\n{against}\n-->'
+    # FBref pages carry ~500 KB of navigation and scripts around the tables
+    filler = '<div class="nav"><a href="/en/">FBref</a></div>\n' * 4000
+    return f"<html><head><title>{team} Match Logs</title></head><body>{filler}{tables}{filler}</body></html>"
+
+
+def competition_page(season):
+    links = "".join(
+        f'<a href="/en/squads/{squad_id}/{season}/{team.replace(" ", "-")}-Stats">{team}</a>'
+        for team, squad_id in SQUAD_IDS.items()
+    )
+    return f"<html><body><table id='results'>{links}</table></body></html>"
+
+
+def saved_pages():
+    """Return the url paths that have a page saved under FIXTURE_DIR."""
+    return [url_path for url_path in PAGE_LAYOUTS if os.path.exists(fixture_path(url_path))]
+
+
+def load_fixture(url_path, team="Barcelona", season="2023-2024"):
+    """Return the recorded page of a category, or a generated one when none was recorded."""
+    try:
+        with open(fixture_path(url_path), "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return generate_page(url_path, team, season)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    latency = 0
+    _pages = {}
+    _lock = threading.Lock()
+
+    def _page(self):
+        parts = self.path.split("?")[0].strip("/").split("/")
+        # /en/comps/<id>/<season>/<slug>
+        if len(parts) >= 4 and parts[1] == "comps":
+            return competition_page(parts[3])
+        # /en/squads/<squad id>/<season>/matchlogs/<comp>/<url path>/<slug>
+        if len(parts) >= 7 and parts[1] == "squads" and parts[4] == "matchlogs" and parts[6] in PAGE_LAYOUTS:
+            teams = {squad_id: team for team, squad_id in SQUAD_IDS.items()}
+            key = (parts[6], teams.get(parts[2], "Barcelona"), parts[3])
+            with self._lock:
+                if key not in self._pages:
+                    self._pages[key] = load_fixture(*key)
+                return self._pages[key]
+        return None
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        page = self._page()
+        if page is None:
+            self.send_error(404)
+            return
+        body = page.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, latency=0):
+    """Serve fixtures on localhost from a daemon thread; returns the server (see server_address)."""
+    handler = type("Handler", (FixtureHandler,), {"latency": latency, "_pages": {}})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def record(team, season, competition="laliga"):
+    """Save the live FBref pages of one team as fixtures."""
+    from scrapers.engine import category_url
+    from scrapers.registry import categories_for
+    from utils.page_cache import fetch_page
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for stat_category in categories_for(competition):
+        url = category_url(stat_category, season, team)
+        url_path = url.split("/matchlogs/")[1].split("/")[1]
+        with open(fixture_path(url_path), "w", encoding="utf-8") as f:
+            f.write(fetch_page(url))
+        print(f"✅ Recorded {url_path} from {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["generate", "record", "serve"])
+    parser.add_argument("--team", default="Barcelona")
+    parser.add_argument("--season", default="2023-2024")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        os.makedirs(GENERATED_DIR, exist_ok=True)
+        for url_path in PAGE_LAYOUTS:
+            path = fixture_path(url_path, GENERATED_DIR)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(generate_page(url_path, args.team, args.season))
+            print(f"✅ Generated {path}")
+    elif args.command == "record":
+        record(args.team, args.season)
+    else:
+        server = start_server(args.port, args.latency_ms / 1000)
+        print(f"🌐 Serving fixtures on http://127.0.0.1:{server.server_address[1]} "
+              f"(set FBREF_BASE_URL to this address)")
+        threading.Event().wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,224 @@
-from pymongo import MongoClient
 import os
-from dotenv import load_dotenv
+import re
+import hashlib
+import threading
+from scrapers.leagues import COMPETITIONS
+from scrapers.registry import CATEGORIES, categories_for
+from scrapers.schema import canonical_name, normalize
+import warehouse
+from utils import metrics
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 
+DEFAULT_MONGO_URI = "mongodb://localhost:27017/"
 
-load_dotenv()
+# pymongo and the client are only loaded when the database is first used
+_client = None
+_client_lock = threading.Lock()
 
-MONGO_URI = "mongodb://localhost:27017/"
-client = MongoClient(MONGO_URI)
+def get_client():
+    """Return the process-wide MongoClient, connecting on first use (MONGO_URI, also read from .env)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from dotenv import load_dotenv
+            from pymongo import MongoClient
+
+            load_dotenv()
+            _client = MongoClient(os.getenv("MONGO_URI", DEFAULT_MONGO_URI))
+    return _client
+
+def close_client():
+    """Close the client; the next get_client() connects again (e.g. after forking)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+def __getattr__(name):
+    # db.client keeps working for callers written before the client became lazy
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# "per_team": one collection per team/category/season in a per-season database (legacy)
+# "unified": one fact collection per category, keyed by (season, team, date, opponent)
+STORAGE_MODE = os.getenv("FBREF_STORAGE_MODE", "per_team")
+UNIFIED_DB = "football"
+
+# Documents per bulk_write; only one batch of dicts is built at a time
+WRITE_BATCH_SIZE = 1000
+
+STAT_CATEGORIES = list(CATEGORIES)
+ALL_STAT_CATEGORIES = [name for key in COMPETITIONS for name in categories_for(key)]
+
+LEGACY_COLLECTION_PATTERN = re.compile(
+    r"^(?P<team>.+)_(?P<stat_category>(?:%s)_[a-z]+(?:_against)?)_(?P<year>\d{4}-\d{4})$"
+    % "|".join(COMPETITIONS)
+)
+
+# Bumped whenever update_data writes, so in-process read caches know when to reload
+_data_versions = {}
+_data_versions_lock = threading.Lock()
+
+def get_data_version(season, team, stat_category):
+    return _data_versions.get((season, team, stat_category), 0)
+
+def bump_data_version(season, team, stat_category):
+    with _data_versions_lock:
+        key = (season, team, stat_category)
+        _data_versions[key] = _data_versions.get(key, 0) + 1
 
 def get_season_db(season):
     db_name = f"football_{season}"
-    return client[db_name]
+    return get_client()[db_name]
 
-def check_if_scraping_needed(team, stat_category, year, season, hours_threshold=24):
-    db = get_season_db(season)
+def get_fact_collection(stat_category):
+    return get_client()[UNIFIED_DB][f"matchlogs_{stat_category}"]
+
+def get_collection(team, stat_category, year, season):
+    """Return the collection holding a team's matches and the filter selecting them."""
+    if STORAGE_MODE == "unified":
+        return get_fact_collection(stat_category), {"season": season, "team": team}
     collection_name = f"{team}_{stat_category}_{year}"
-    collection = db[collection_name]
-    
-    if collection.count_documents({}) == 0:
-        print(f"Collection {collection_name} is empty. Scraping needed.")
-        return True
-        
-    latest_doc = collection.find_one(
-        sort=[('last_updated', -1)]
+    return get_season_db(season)[collection_name], {}
+
+_indexed_categories = set()
+
+def ensure_fact_indexes(stat_category):
+    from pymongo import ASCENDING
+
+    if stat_category in _indexed_categories:
+        return
+    collection = get_fact_collection(stat_category)
+    collection.create_index(
+        [("season", ASCENDING), ("team", ASCENDING), ("date", ASCENDING), ("opponent", ASCENDING)],
+        unique=True
     )
-    
-    if not latest_doc:
+    collection.create_index([("season", ASCENDING), ("date", ASCENDING)])
+    collection.create_index('last_updated')
+    _indexed_categories.add(stat_category)
+
+# Low-cardinality text fields stored as pandas categoricals when loaded
+CATEGORICAL_FIELDS = {'venue', 'result', 'opponent', 'comp', 'day', 'round', 'team', 'season'}
+# Stored on each document for the write path, not useful to readers
+INTERNAL_FIELDS = {'row_hash'}
+
+def _frame_from_batches(batches):
+    """Build a DataFrame from a find_raw_batches cursor, one batch of documents at a time.
+
+    Each raw BSON batch becomes a frame before the next is read, so only one
+    batch of documents ever exists as Python dicts.
+    """
+    from bson import decode_all
+
+    frames = [pd.DataFrame(decode_all(batch)) for batch in batches]
+    if not frames:
+        return None
+    df = pd.concat(frames, ignore_index=True)
+    if df.empty:
+        return None
+    return df[sorted(df.columns, key=lambda k: k != '_id')]
+
+def coerce_types(df):
+    """Give loaded match records proper dtypes: numbers, datetimes and categoricals."""
+    for column in df.columns:
+        field = canonical_name(column)
+        if column == '_id':
+            df[column] = df[column].astype(str)
+        elif field in ('date', 'last_updated'):
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+        elif field in CATEGORICAL_FIELDS:
+            df[column] = df[column].astype('category')
+        elif df[column].dtype == object:
+            numeric = pd.to_numeric(df[column], errors='coerce')
+            if numeric.notna().sum() == df[column].notna().sum():
+                df[column] = numeric
+    return df
+
+def _projection(columns):
+    if not columns:
+        return {field: 0 for field in INTERNAL_FIELDS}
+    return {column: 1 for column in columns}
+
+def load_matchlogs_frame(team, stat_category, year, season, columns=None, batch_size=1000):
+    """Load a team's match records as a typed DataFrame, fetching only the requested columns."""
+    collection, query = get_collection(team, stat_category, year, season)
+    batches = collection.find_raw_batches(query, _projection(columns), batch_size=batch_size)
+    df = _frame_from_batches(batches)
+    return coerce_types(df) if df is not None else None
+
+def load_league_frame(season, stat_category, columns=None, batch_size=1000):
+    """Load every team's match records for a season as one typed DataFrame (unified mode)."""
+    batches = get_fact_collection(stat_category).find_raw_batches(
+        {"season": season}, _projection(columns), batch_size=batch_size
+    )
+    df = _frame_from_batches(batches)
+    return coerce_types(df) if df is not None else None
+
+def get_metadata_collection():
+    return get_client()[UNIFIED_DB]["scrape_metadata"]
+
+def _metadata_id(season, team, stat_category):
+    return f"{season}|{team}|{stat_category}"
+
+def load_scrape_metadata(seasons=None):
+    """Load scrape metadata in one query, keyed by (season, team, stat_category)."""
+    query = {"season": {"$in": list(seasons)}} if seasons else {}
+    return {
+        (doc["season"], doc["team"], doc["stat_category"]): doc
+        for doc in get_metadata_collection().find(query)
+    }
+
+def record_scrape(season, team, stat_category, row_count, content_hash=None, validators=None,
+                  warehouse_pending=None):
+    """Store when a team/category/season was last scraped and what it contained.
+
+    warehouse_pending flags a partition whose warehouse append failed, so
+    `python warehouse.py --pending` can export it again from MongoDB.
+    """
+    fields = {
+        "season": season,
+        "team": team,
+        "stat_category": stat_category,
+        "last_scraped": datetime.now(),
+        "row_count": row_count,
+    }
+    if content_hash is not None:
+        fields["content_hash"] = content_hash
+    if validators:
+        fields["etag"] = validators.get("etag")
+        fields["last_modified"] = validators.get("last_modified")
+    if warehouse_pending is not None:
+        fields["warehouse_pending"] = warehouse_pending
+
+    get_metadata_collection().update_one(
+        {"_id": _metadata_id(season, team, stat_category)},
+        {"$set": fields},
+        upsert=True
+    )
+
+def check_if_scraping_needed(team, stat_category, year, season, hours_threshold=24, metadata=None):
+    """Decide from the scrape metadata store whether a team/category/season is stale.
+
+    Pass the dict from load_scrape_metadata to check in memory instead of
+    querying the store for this one key.
+    """
+    collection_name = f"{team}_{stat_category}_{year}"
+
+    if metadata is not None:
+        meta = metadata.get((season, team, stat_category))
+    else:
+        meta = get_metadata_collection().find_one({"_id": _metadata_id(season, team, stat_category)})
+
+    if not meta:
+        print(f"No scrape recorded for {collection_name}. Scraping needed.")
         return True
         
     current_time = datetime.now()
-    last_update = latest_doc.get('last_updated', datetime.min)
+    last_update = meta.get('last_scraped', datetime.min)
     
     if isinstance(last_update, str):
         last_update = datetime.fromisoformat(last_update.replace('Z', '+00:00'))
@@ -45,73 +232,219 @@ def check_if_scraping_needed(team, stat_category, year, season, hours_threshold=
     print(f"Recent data exists in {collection_name}. Skipping scrape.")
     return False
 
-def verify_database_connection():
-    client.admin.command('ping')
+def verify_database_connection(season="2023-2024"):
+    get_client().admin.command('ping')
     print("✅ MongoDB connection successful")
+
+    get_metadata_collection().create_index('season')
     
-    collections = [
-        'laliga_defensive',
-        'laliga_possession',
-        'laliga_passtypes',
-        'laliga_stats',
-        'laliga_keeper',
-        'laliga_passing',
-        'laliga_goalshot',
-        'laliga_misc',
-        'laliga_shooting'
-    ]
-    
-    season = "2023-2024"  # Example 
+    if STORAGE_MODE == "unified":
+        for stat_category in ALL_STAT_CATEGORIES:
+            ensure_fact_indexes(stat_category)
+            print(f"✅ Verified collection: matchlogs_{stat_category}")
+        return True
+
+    # Index the per-team collections that actually exist for the season
     db = get_season_db(season)
-    for collection_name in collections:
-        collection = db[collection_name]
-        collection.create_index('last_updated')
-        print(f"✅ Verified collection: {collection_name}")
+    for collection_name in db.list_collection_names():
+        if LEGACY_COLLECTION_PATTERN.match(collection_name):
+            db[collection_name].create_index('last_updated')
+            print(f"✅ Verified collection: {collection_name}")
         
     return True
 
-def update_data(data, year, team, stat_category, season):
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return value
+
+def _canonical_record(record):
+    """Rename a stored document's fields to canonical names, with the match date as a datetime."""
+    record = {canonical_name(key): value for key, value in record.items()}
+    if isinstance(record.get('date'), str):
+        record['date'] = _parse_date(record['date'])
+    return record
+
+def normalize_stored_columns(season, batch_size=1000):
+    """Rewrite a season's stored documents that still use team-dependent field names."""
+    from pymongo import ReplaceOne
+
+    if STORAGE_MODE == "unified":
+        targets = [(get_fact_collection(stat_category), {"season": season})
+                   for stat_category in ALL_STAT_CATEGORIES]
+    else:
+        db = get_season_db(season)
+        targets = [(db[name], {}) for name in db.list_collection_names()
+                   if LEGACY_COLLECTION_PATTERN.match(name)]
+
+    rewritten = 0
+    for collection, query in targets:
+        operations = []
+        for record in collection.find(query):
+            canonical = _canonical_record(record)
+            if canonical == record:
+                continue
+            operations.append(ReplaceOne({"_id": record['_id']}, canonical))
+            if len(operations) >= batch_size:
+                rewritten += collection.bulk_write(operations, ordered=False).modified_count
+                operations = []
+        if operations:
+            rewritten += collection.bulk_write(operations, ordered=False).modified_count
+
+    print(f"✅ Normalized field names of {rewritten} documents for {season}")
+    return rewritten
+
+def migrate_legacy_collections(season, drop=False, batch_size=1000):
+    """Copy a season's per-team collections into the unified fact collections."""
+    from pymongo import ReplaceOne
+
     db = get_season_db(season)
-    collection_name = f"{team}_{stat_category}_{year}"
-    collection = db[collection_name]
+    migrated = 0
+
+    for collection_name in db.list_collection_names():
+        match = LEGACY_COLLECTION_PATTERN.match(collection_name)
+        if not match:
+            continue
+
+        team = match.group('team')
+        stat_category = match.group('stat_category')
+        ensure_fact_indexes(stat_category)
+        target = get_fact_collection(stat_category)
+
+        operations = []
+        for record in db[collection_name].find():
+            date, opponent = str(record['_id']).split('_', 1)
+            record = _canonical_record(record)
+            record.update({"season": season, "team": team, "opponent": opponent})
+            record.setdefault("date", _parse_date(date))
+            record['_id'] = f"{season}_{team}_{date}_{opponent}"
+            operations.append(ReplaceOne({"_id": record['_id']}, record, upsert=True))
+            if len(operations) >= batch_size:
+                target.bulk_write(operations, ordered=False)
+                operations = []
+        if operations:
+            target.bulk_write(operations, ordered=False)
+
+        migrated += 1
+        print(f"✅ Migrated {collection_name} -> matchlogs_{stat_category}")
+        if drop:
+            db.drop_collection(collection_name)
+
+    print(f"✅ Migrated {migrated} collections for {season}")
+    return migrated
+
+def hash_rows(data):
+    """Return one content hash per row (hex strings), independent of the index.
+
+    The column names are folded into every row's hash, so renaming a column
+    marks each row as changed and it is rewritten under the new name.
+    """
+    columns = hashlib.sha1("|".join(map(str, data.columns)).encode("utf-8")).digest()
+    signature = np.frombuffer(columns[:8], dtype=np.uint64)[0]
+    hashes = pd.util.hash_pandas_object(data, index=False).to_numpy() ^ signature
+    return [f"{value:016x}" for value in hashes]
+
+def hash_table(data, row_hashes):
+    """Return a content hash of a whole table: its column names plus every row hash."""
+    digest = hashlib.sha1("|".join(map(str, data.columns)).encode("utf-8"))
+    digest.update("".join(row_hashes).encode("utf-8"))
+    return digest.hexdigest()
+
+def match_ids(data, season, team, unified=False):
+    """Build the document id of every row at once.
+
+    Ids are "YYYY-MM-DD_Opponent", prefixed with season and team in unified
+    mode; rows without a date or an opponent get NaN.
+    """
+    if 'date' not in data.columns or 'opponent' not in data.columns:
+        return pd.Series(float('nan'), index=data.index, dtype=object)
+    opponents = data['opponent'].astype(object)
+    ids = data['date'].dt.strftime('%Y-%m-%d').astype(object) + '_' + opponents
+    ids = ids.where(opponents.notna() & (opponents != '') & data['date'].notna())
+    if unified:
+        ids = f"{season}_{team}_" + ids
+    return ids
+
+@metrics.timed("write")
+def update_data(data, year, team, stat_category, season, metadata=None, validators=None):
+    """Upsert new or changed match records with unordered bulk_writes of WRITE_BATCH_SIZE documents.
+
+    An unchanged table (same content hash as the last scrape) is not written at
+    all, and rows whose hash matches the stored one are skipped. Returns a dict
+    with the inserted/updated/unchanged counts.
+    """
+    from pymongo import ReplaceOne
+
+    collection, query = get_collection(team, stat_category, year, season)
+    collection_name = collection.name
+    unified = STORAGE_MODE == "unified"
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
     
     if data is not None and not data.empty:
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = [f"{col[0]}_{col[1]}" if col[1] else col[0] 
-                            for col in data.columns]
-        
-        current_time = datetime.now()
-        data['last_updated'] = current_time
-        
-        data_dict = data.to_dict(orient='records')
+        data = normalize(data)
+
+        row_hashes = hash_rows(data)
+        content_hash = hash_table(data, row_hashes)
+
+        if metadata is not None:
+            meta = metadata.get((season, team, stat_category))
+        else:
+            meta = get_metadata_collection().find_one({"_id": _metadata_id(season, team, stat_category)})
+
+        if meta and meta.get("content_hash") == content_hash:
+            counts["unchanged"] = len(data)
+            metrics.inc("fbref_documents_total", len(data), result="unchanged")
+            record_scrape(season, team, stat_category, len(data), content_hash, validators)
+            print(f"✅ {collection_name} is unchanged - skipping write")
+            return counts
         
-        for record in data_dict:
-            # Use the team name dynamically
-            date_key = f'For {team}_Date' 
-            opponent_key = f'For {team}_Opponent'  
-            
-            date = record.get(date_key, record.get('Date', ''))
-            opponent = record.get(opponent_key, record.get('Opponent', ''))
-            
-            if date and opponent:
-                record['_id'] = f"{date}_{opponent}"
-                print(f"Processing record: {record}") 
-            
-                # Check if the record already exists
-                existing_record = collection.find_one({"_id": record['_id']})
-                if existing_record:
-                    print(f"Updating existing record: {record['_id']}")  
-                else:
-                    print(f"Inserting new record: {record['_id']}")  
-                collection.update_one(
-                    {"_id": record.get("_id", None)},
-                    {"$set": record},
-                    upsert=True
-                )
+        data = data.assign(last_updated=datetime.now(), row_hash=row_hashes)
+        data['_id'] = match_ids(data, season, team, unified)
+        # Blank separator rows and repeated header rows have no match date or opponent
+        data = data[data['_id'].notna()]
+
+        stored_hashes = {
+            doc['_id']: doc.get('row_hash')
+            for doc in collection.find(query, {'row_hash': 1})
+        }
+        unchanged = data['_id'].map(stored_hashes) == data['row_hash']
+        counts["unchanged"] = int(unchanged.sum())
+        changed = data[~unchanged]
+        warehouse_pending = None
+        if unified:
+            changed = changed.assign(season=season, team=team)
+
+        if not changed.empty:
+            if unified:
+                ensure_fact_indexes(stat_category)
+            for start in range(0, len(changed), WRITE_BATCH_SIZE):
+                batch = changed.iloc[start:start + WRITE_BATCH_SIZE]
+                # Replaced whole, so fields of a renamed column don't linger
+                operations = [ReplaceOne({"_id": record['_id']}, record, upsert=True)
+                              for record in batch.to_dict(orient='records')]
+                result = collection.bulk_write(operations, ordered=False)
+                counts["inserted"] += result.upserted_count
+                counts["updated"] += result.matched_count
+            bump_data_version(season, team, stat_category)
+            if warehouse.is_enabled():
+                # Rows written here count as unchanged from now on, so a failed append is
+                # flagged for a re-export rather than retried by the next scrape
+                try:
+                    warehouse.append_rows(changed, season, stat_category, team)
+                except Exception as e:
+                    warehouse_pending = True
+                    print(f"⚠️ Could not append {collection_name} to the warehouse "
+                          f"(season={season}/category={stat_category}/team={team}), "
+                          f"re-export it with `python warehouse.py --pending`: {e}")
         
-        print(f"✅ Successfully updated {collection_name} collection with {len(data_dict)} records")
+        record_scrape(season, team, stat_category, len(data), content_hash, validators, warehouse_pending)
+        for result, count in counts.items():
+            metrics.inc("fbref_documents_total", count, result=result)
+        print(f"✅ Successfully updated {collection_name} collection: "
+              f"{counts['inserted']} inserted, {counts['updated']} updated, "
+              f"{counts['unchanged']} unchanged")
     else:
         print(f"⚠️ Skipping {collection_name} update - No valid data")
-        pass
         
-    print("✅ Database update complete")
+    return counts
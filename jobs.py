@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import metrics
+from utils.single_flight import fetch_run
+
+JOBS_DB_PATH = os.getenv("FBREF_JOBS_DB", "scrape_jobs.sqlite3")
+WORKER_THREADS = int(os.getenv("FBREF_WORKER_THREADS", 4))
+POLL_INTERVAL = 2
+
+ACTIVE_STATUSES = ("queued", "running")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    season TEXT NOT NULL,
+    team TEXT NOT NULL,
+    stat_category TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    priority INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    rows INTEGER,
+    error TEXT
+);
+-- At most one queued or running job per key, so concurrent users can't trigger duplicate scrapes
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_key
+    ON jobs (season, team, stat_category) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, id);
+"""
+
+
+def _connect():
+    conn = sqlite3.connect(JOBS_DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def enqueue(season, team, stat_category, priority=0):
+    """Queue a scrape job; returns the id of the new job or of the identical one already pending."""
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT OR IGNORE INTO jobs (season, team, stat_category, priority, enqueued_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (season, team, stat_category, priority, time.time())
+        )
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE season = ? AND team = ? AND stat_category = ? "
+            "AND status IN ('queued', 'running')",
+            (season, team, stat_category)
+        ).fetchone()
+        return row["id"] if row else None
+    finally:
+        conn.close()
+
+
+def enqueue_many(season, teams, categories, priority=0):
+    return [enqueue(season, team, category, priority) for team in teams for category in categories]
+
+
+def claim(limit=1):
+    """Atomically move up to `limit` queued jobs to running, highest priority first."""
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' ORDER BY priority DESC, id LIMIT ?",
+            (limit,)
+        ).fetchall()
+        now = time.time()
+        conn.executemany(
+            "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+            [(now, row["id"]) for row in rows]
+        )
+        conn.execute("COMMIT")
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def finish(job_id, rows=None, error=None):
+    conn = _connect()
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, rows = ?, error = ? WHERE id = ?",
+            ("failed" if error else "done", time.time(), rows, error, job_id)
+        )
+    finally:
+        conn.close()
+
+
+def requeue_running():
+    """Put jobs left running by a crashed worker back in the queue."""
+    conn = _connect()
+    try:
+        return conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL "
+                            "WHERE status = 'running'").rowcount
+    finally:
+        conn.close()
+
+
+def get_jobs(job_ids):
+    if not job_ids:
+        return []
+    conn = _connect()
+    try:
+        placeholders = ",".join("?" * len(job_ids))
+        rows = conn.execute(f"SELECT * FROM jobs WHERE id IN ({placeholders}) ORDER BY id",
+                            list(job_ids)).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def _run_job(job):
+    from scraper import run_scraper
+
+    try:
+        data = run_scraper(job["season"], job["team"], job["stat_category"], job["season"],
+                           raise_errors=True)
+        finish(job["id"], rows=len(data) if data is not None else None)
+    except Exception as e:
+        finish(job["id"], error=str(e))
+
+
+def run_worker(threads=WORKER_THREADS, poll_interval=POLL_INTERVAL):
+    """Process queued jobs forever. Run a single worker per queue database."""
+    recovered = requeue_running()
+    if recovered:
+        print(f"♻️ Re-queued {recovered} jobs left running by a previous worker")
+    print(f"👷 Worker started with {threads} threads, queue: {JOBS_DB_PATH}")
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        while True:
+            batch = claim(limit=threads * 4)
+            if not batch:
+                time.sleep(poll_interval)
+                continue
+            # One fetch run per batch so jobs for the same page share the download
+            with fetch_run():
+                futures = [executor.submit(contextvars.copy_context().run, _run_job, job)
+                           for job in batch]
+                for future in futures:
+                    future.result()
+            metrics.write_file()
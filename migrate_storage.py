@@ -0,0 +1,29 @@
+import argparse
+import db
+from utils.logging_config import configure_logging
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Migrate per-team collections into the unified match-fact collections."
+    )
+    parser.add_argument("seasons", nargs="+", help="Seasons to migrate, e.g. 2023-2024")
+    parser.add_argument("--drop", action="store_true", help="Drop the per-team collections after copying")
+    parser.add_argument("--normalize-only", action="store_true",
+                        help="Only rename stored fields to canonical column names, in the current storage mode")
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.normalize_only:
+        for season in args.seasons:
+            db.normalize_stored_columns(season)
+        return
+
+    db.STORAGE_MODE = "unified"
+    db.verify_database_connection()
+    for season in args.seasons:
+        db.migrate_legacy_collections(season, drop=args.drop)
+
+
+if __name__ == "__main__":
+    main()
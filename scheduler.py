@@ -1,14 +1,171 @@
-# from apscheduler.schedulers.blocking import BlockingScheduler
-# import scraper
+import logging
+import os
+from datetime import datetime, timedelta
 
-# def job():
-#     print("Running scheduled scraping job...")
-#     scraped_data = scraper.run_all_scrapers()
-#     scraper.update_data(scraped_data)
+import pandas as pd
+from apscheduler.jobstores.mongodb import MongoDBJobStore
+from apscheduler.schedulers.blocking import BlockingScheduler
 
-# scheduler = BlockingScheduler()
-# scheduler.add_job(job, 'interval', hours=1)  # Run every hour
+import db
+from scraper import run_all_scrapers
+from scrapers.registry import category_name
+from scrapers.schema import canonical_name
+from scrapers.squad_index import get_squads
 
-# if __name__ == "__main__":
-#     print("Starting scheduler...")
-#     scheduler.start()
+logger = logging.getLogger(__name__)
+
+COMPETITIONS = os.getenv("FBREF_SCHEDULER_COMPETITIONS", "laliga").split(",")
+# Kickoff to final whistle plus the time FBref takes to publish match stats
+MATCH_DURATION = timedelta(hours=3)
+# Kickoff assumed when FBref hasn't announced a time yet
+DEFAULT_KICKOFF = "20:00"
+# How far ahead post-match refresh jobs are scheduled
+LOOKAHEAD = timedelta(days=8)
+FIXTURE_REFRESH_HOUR = 6
+
+_scheduler = None
+
+
+def current_season(now=None):
+    """European seasons run August to May, e.g. "2024-2025"."""
+    now = now or datetime.now()
+    start = now.year if now.month >= 8 else now.year - 1
+    return f"{start}-{start + 1}"
+
+
+def _find_column(df, field):
+    """Return the column holding a canonical field, also matching documents stored before normalization."""
+    return next((column for column in df.columns if canonical_name(column) == field), None)
+
+
+def load_fixtures(competition_key, season, team):
+    """Return a team's fixtures from its stored schedule: kickoff time and whether it was played."""
+    df = db.load_matchlogs_frame(team, category_name(competition_key, "stats"), season, season)
+    if df is None:
+        return pd.DataFrame(columns=["kickoff", "played"])
+
+    date_column = _find_column(df, "date")
+    time_column = _find_column(df, "time")
+    result_column = _find_column(df, "result")
+    if date_column is None:
+        return pd.DataFrame(columns=["kickoff", "played"])
+
+    times = df[time_column].fillna(DEFAULT_KICKOFF) if time_column else DEFAULT_KICKOFF
+    kickoff = pd.to_datetime(df[date_column].dt.strftime("%Y-%m-%d") + " " + times, errors="coerce")
+    played = df[result_column].notna() if result_column else pd.Series(False, index=df.index)
+    return pd.DataFrame({"kickoff": kickoff, "played": played}).dropna(subset=["kickoff"])
+
+
+def teams_to_refresh(competition_key, season, now=None):
+    """Teams that finished a match since their stats were last scraped, most recent match first."""
+    now = now or datetime.now()
+    metadata = db.load_scrape_metadata([season])
+    category = category_name(competition_key, "shooting")
+
+    pending = []
+    for team in get_squads(competition_key, season):
+        fixtures = load_fixtures(competition_key, season, team)
+        finished = fixtures.loc[fixtures["kickoff"] + MATCH_DURATION <= now, "kickoff"]
+        if finished.empty:
+            continue
+
+        last_match = finished.max().to_pydatetime()
+        meta = metadata.get((season, team, category))
+        last_scraped = meta.get("last_scraped") if meta else None
+        if last_scraped is None or last_scraped < last_match + MATCH_DURATION:
+            pending.append((last_match, team))
+
+    pending.sort(reverse=True)
+    return [team for _, team in pending]
+
+
+def refresh_team(competition_key, season, team):
+    """Re-scrape every stat category of one team after it played."""
+    logger.info(f"Refreshing {team} ({competition_key} {season}) after a match")
+    run_all_scrapers(season, teams=[team], competitions=[competition_key], force=True)
+
+
+def catch_up():
+    """Re-scrape only the teams that played since the last run, highest priority first."""
+    season = current_season()
+    for competition_key in COMPETITIONS:
+        teams = teams_to_refresh(competition_key, season)
+        if not teams:
+            logger.info(f"No new matches for {competition_key} {season}")
+            continue
+        logger.info(f"{len(teams)} teams played since the last run in {competition_key}: {teams}")
+        run_all_scrapers(season, teams=teams, competitions=[competition_key], force=True)
+
+
+def schedule_match_refreshes(scheduler, competition_key, season, now=None):
+    """Add one post-match refresh job per upcoming fixture; job ids make re-planning idempotent."""
+    now = now or datetime.now()
+    scheduled = 0
+    for team in get_squads(competition_key, season):
+        fixtures = load_fixtures(competition_key, season, team)
+        upcoming = fixtures.loc[
+            ~fixtures["played"] & (fixtures["kickoff"] > now) & (fixtures["kickoff"] < now + LOOKAHEAD),
+            "kickoff"
+        ]
+        for kickoff in upcoming:
+            scheduler.add_job(
+                "scheduler:refresh_team",
+                trigger="date",
+                run_date=kickoff.to_pydatetime() + MATCH_DURATION,
+                args=[competition_key, season, team],
+                id=f"match:{competition_key}:{season}:{team}:{kickoff:%Y%m%d%H%M}",
+                replace_existing=True,
+                misfire_grace_time=6 * 60 * 60,
+            )
+            scheduled += 1
+    logger.info(f"Scheduled {scheduled} post-match refreshes for {competition_key} {season}")
+
+
+def refresh_fixtures():
+    """Refresh every team's schedule, then plan post-match refreshes from it."""
+    season = current_season()
+    for competition_key in COMPETITIONS:
+        # Forced: a day-old scrape is just under the 24h freshness threshold at the next 06:00 run.
+        # Cached pages are revalidated, so unchanged schedules cost a 304
+        run_all_scrapers(season, categories=["stats"], competitions=[competition_key], force=True)
+        if _scheduler is not None:
+            schedule_match_refreshes(_scheduler, competition_key, season)
+
+
+def create_scheduler():
+    """Build the scheduler with its jobs persisted in MongoDB."""
+    global _scheduler
+    jobstore = MongoDBJobStore(database=db.UNIFIED_DB, collection="scheduler_jobs", client=db.get_client())
+    scheduler = BlockingScheduler(
+        jobstores={"default": jobstore},
+        job_defaults={"coalesce": True, "max_instances": 1},
+    )
+    scheduler.add_job(
+        "scheduler:refresh_fixtures",
+        trigger="cron",
+        hour=FIXTURE_REFRESH_HOUR,
+        id="refresh_fixtures",
+        replace_existing=True,
+        next_run_time=datetime.now(),
+    )
+    scheduler.add_job(
+        "scheduler:catch_up",
+        trigger="interval",
+        hours=1,
+        id="catch_up",
+        replace_existing=True,
+    )
+    _scheduler = scheduler
+    return scheduler
+
+
+if __name__ == "__main__":
+    # Jobs reference "scheduler:<function>", so run them from the importable module, not __main__
+    import scheduler
+    from utils import metrics
+    from utils.logging_config import configure_logging
+
+    configure_logging()
+    print("Starting scheduler...")
+    metrics.serve()
+    scheduler.create_scheduler().start()
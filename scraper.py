@@ -1,36 +1,136 @@
-import importlib
 import os
-from db import update_data, check_if_scraping_needed
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from db import update_data, check_if_scraping_needed, load_scrape_metadata
+from scrapers.engine import scrape_category, category_url
+from scrapers.leagues import DEFAULT_COMPETITION
+from scrapers.registry import CATEGORY_SPECS, categories_for, category_name, get_category
+from scrapers.squad_index import get_squads
+from utils import metrics
+from utils.page_cache import get_default_cache
+from utils.single_flight import fetch_run
 
 
-SCRAPER_FOLDER = "scrapers"
-def run_scraper(year, team, stat_category, season):
-    """Run a single scraper for the requested stat category."""
+MAX_WORKERS = int(os.getenv("FBREF_MAX_WORKERS", 8))
+
+# Opponent tables ship on the same match-log page as the team's own table,
+# so "<category>_against" is scraped from the download of "<category>".
+AGAINST_SUFFIX = "_against"
+
+def run_scraper(year, team, stat_category, season, metadata=None, force=False, raise_errors=False):
+    """Run a single scraper for the requested stat category.
+
+    Page fetches are coalesced with any fetch run the caller has opened.
+    Batch callers pass preloaded scrape metadata to skip the freshness query.
+    With force, the freshness check is skipped and cached pages are revalidated.
+    Errors are logged and return None unless raise_errors is set.
+    """
+    with fetch_run():
+        return _run_scraper(year, team, stat_category, season, metadata, force, raise_errors)
+
+def _run_scraper(year, team, stat_category, season, metadata=None, force=False, raise_errors=False):
     try:
-        if not check_if_scraping_needed(team, stat_category, year, season):
+        if not force and not check_if_scraping_needed(team, stat_category, year, season, metadata=metadata):
             print(f"📊 Skipping {stat_category} - Recent data exists for {team} ({year})")
+            metrics.inc("fbref_scrapes_total", outcome="skipped")
             return None
 
-        module_name = f"{SCRAPER_FOLDER}.{stat_category}"  
-        module = importlib.import_module(module_name)
+        base_category = stat_category
+        table_id = 'matchlogs_for'
+        if stat_category.endswith(AGAINST_SUFFIX):
+            base_category = stat_category[:-len(AGAINST_SUFFIX)]
+            table_id = 'matchlogs_against'
 
-        function_name = f"process_{stat_category.split('_')[1]}_stats"
-        if stat_category == "laliga_stats":
-            function_name = "process_stats"
-        
-        process_function = getattr(module, function_name)
-
-        print(f"🔄 Running {function_name}({year}, {team}) from {stat_category}...")
-        data = process_function(year, team)  # Run the scraper
-
-        # Debug statement to log the fetched data
-        print(f"Fetched data for {team}: {data}")
+        print(f"🔄 Scraping {stat_category} for {team} ({year})...")
+        data = scrape_category(base_category, year, team, table_id=table_id,
+                               ttl=0 if force else None)  # Run the scraper
 
         if data is not None:
-            update_data(data, year, team, stat_category, season)  # Store in MongoDB
+            validators = get_default_cache().validators(category_url(base_category, year, team))
+            update_data(data, year, team, stat_category, season, metadata, validators)  # Store in MongoDB
             print(f"✅ Successfully scraped {stat_category} for {team} ({year})")
+        metrics.inc("fbref_scrapes_total", outcome="scraped")
         return data
 
     except Exception as e:
         print(f"❌ Error running {stat_category}: {e}")
-        return None
\ No newline at end of file
+        metrics.inc("fbref_scrapes_total", outcome="failed")
+        if raise_errors:
+            raise
+        return None
+
+def _category_names(competition_key, categories):
+    if not categories:
+        return categories_for(competition_key)
+    names = []
+    for category in categories:
+        name = category_name(competition_key, category) if category in CATEGORY_SPECS else category
+        if name.startswith(f"{competition_key}_"):
+            names.append(name)
+    return names
+
+def iter_jobs(seasons, teams=None, categories=None, competitions=None, include_against=False):
+    """Lazily expand seasons x competitions x teams x categories into (season, team, stat_category) jobs.
+
+    Categories can be given as full names ("laliga_shooting") or as kinds
+    ("shooting"), which apply to every competition. Without explicit teams,
+    each competition's squads come from the squad index, looked up one season
+    at a time as jobs are consumed; explicit teams are matched against it
+    when several competitions are requested.
+    """
+    competitions = competitions or [DEFAULT_COMPETITION]
+    for competition_key in competitions:
+        names = _category_names(competition_key, categories)
+        if include_against:
+            names += [f"{name}{AGAINST_SUFFIX}" for name in names if get_category(name)[1].has_against]
+
+        for season in seasons:
+            if teams and len(competitions) == 1:
+                season_teams = list(teams)
+            else:
+                squads = get_squads(competition_key, season)
+                season_teams = [team for team in teams if team in squads] if teams else list(squads)
+            for team in season_teams:
+                for name in names:
+                    yield season, team, name
+
+def plan_jobs(seasons, teams=None, categories=None, competitions=None, include_against=False):
+    """All jobs of iter_jobs as a list."""
+    return list(iter_jobs(seasons, teams, categories, competitions, include_against))
+
+def run_all_scrapers(seasons, teams=None, categories=None, max_workers=MAX_WORKERS,
+                     include_against=False, competitions=None, force=False):
+    """Run every (season, team, stat_category) scraper on a bounded worker pool.
+
+    Requests are throttled by the global rate limiter in the fetch layer, and
+    all jobs share one fetch run so duplicate pages are downloaded once and
+    parsed on the shared process pool (FBREF_PARSE_WORKERS). With
+    include_against, opponent tables are stored as "<category>_against" from
+    the same page downloads and parses. `competitions` (keys of
+    scrapers.leagues.COMPETITIONS) defaults to La Liga. `force` re-scrapes
+    even when the stored data is recent.
+    Returns a dict mapping each job to its row count (None if nothing was stored).
+    """
+    if isinstance(seasons, str):
+        seasons = [seasons]
+
+    jobs = plan_jobs(seasons, teams, categories, competitions, include_against)
+    print(f"🚀 Running {len(jobs)} scrape jobs with {max_workers} workers...")
+    metadata = load_scrape_metadata(seasons)
+
+    results = {}
+    with fetch_run():
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(contextvars.copy_context().run,
+                                run_scraper, season, team, category, season, metadata, force): (season, team, category)
+                for season, team, category in jobs
+            }
+            for future in as_completed(futures):
+                data = future.result()
+                results[futures[future]] = len(data) if data is not None else None
+
+    scraped = sum(1 for rows in results.values() if rows is not None)
+    print(f"✅ Finished {len(jobs)} jobs: {scraped} scraped, {len(jobs) - scraped} skipped or failed")
+    metrics.write_file()
+    return results
@@ -0,0 +1,69 @@
+import pandas as pd
+
+from scrapers.registry import get_category
+from scrapers.schema import normalize
+from scrapers.squad_index import find_squad_id
+from utils import metrics
+from utils.scraper_utils import retry_on_failure, validate_scrape, safe_read_html
+
+
+def category_url(stat_category, year, team):
+    """Build the FBref match-log URL of a team's stat category for a season."""
+    competition, spec = get_category(stat_category)
+    squad_id = find_squad_id(team, competition.key, year)
+    return spec.url(squad_id, year, team, competition)
+
+
+def trim_columns(df, spec):
+    """Apply the category's column-selection rule."""
+    if spec.last_column is not None:
+        columns_to_keep = df.columns.get_loc(spec.last_column) + 1
+        return df.iloc[:, :columns_to_keep]
+    return df.iloc[:, :-1]  # Remove the "Match Report" column
+
+
+def apply_dtypes(df, spec):
+    """Coerce the columns named in the category's dtype schema (matched on the header name)."""
+    for i, column in enumerate(df.columns):
+        name = column[-1] if isinstance(column, tuple) else column
+        if name in spec.dtypes:
+            df.isetitem(i, pd.to_numeric(df.iloc[:, i], errors='coerce').astype(spec.dtypes[name]))
+    return df
+
+
+@retry_on_failure(max_retries=3, delay=5)
+def scrape_category(stat_category, year, team, table_id=None, ttl=None):
+    """Scrape one stat category's match logs for any team and season.
+
+    `ttl` overrides the page cache TTL (0 forces revalidation with FBref).
+    """
+    _, spec = get_category(stat_category)
+    url = category_url(stat_category, year, team)
+    table_id = table_id or spec.table_id
+
+    print(f"🔍 Checking URL: {url} (table {table_id})")
+
+    df_list = safe_read_html(url, table_id, ttl=ttl)
+    if not df_list:
+        raise ValueError(f"No tables found in the URL for {team} in {year}")
+
+    return process_table(df_list[0], spec, year, team)
+
+
+def process_table(df, spec, year, team):
+    """Turn a parsed match-log table into the stored form: trimmed, typed, canonical and validated."""
+    with metrics.span("trim"):
+        df = trim_columns(df, spec)
+        # Remove the last (totals) row
+        df = df.iloc[:-1]
+
+    with metrics.span("transform"):
+        df = apply_dtypes(df.reset_index(drop=True), spec)
+        df = normalize(df)
+
+    with metrics.span("validate"):
+        valid = validate_scrape(df, __name__)
+    if not valid:
+        raise ValueError(f"Scraping validation failed for {team} ({year})")
+
+    return df
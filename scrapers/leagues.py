@@ -0,0 +1,39 @@
+import os
+from dataclasses import dataclass
+
+FBREF_BASE_URL = os.getenv("FBREF_BASE_URL", "https://fbref.com")
+
+
+@dataclass(frozen=True)
+class Competition:
+    """An FBref competition; `key` prefixes the stat category names stored for it."""
+    key: str
+    comp_id: str
+    slug: str
+
+    @property
+    def matchlogs_id(self):
+        return f"c{self.comp_id}"
+
+    def season_url(self, season):
+        return f"{FBREF_BASE_URL}/en/comps/{self.comp_id}/{season}/{season}-{self.slug}-Stats"
+
+
+COMPETITIONS = {competition.key: competition for competition in (
+    Competition('laliga', '12', 'La-Liga'),
+    Competition('premierleague', '9', 'Premier-League'),
+    Competition('seriea', '11', 'Serie-A'),
+    Competition('bundesliga', '20', 'Bundesliga'),
+    Competition('ligue1', '13', 'Ligue-1'),
+    Competition('championsleague', '8', 'Champions-League'),
+    Competition('europaleague', '19', 'Europa-League'),
+)}
+
+DEFAULT_COMPETITION = 'laliga'
+TOP_FIVE_LEAGUES = ['laliga', 'premierleague', 'seriea', 'bundesliga', 'ligue1']
+
+
+def get_competition(key):
+    if key not in COMPETITIONS:
+        raise ValueError(f"Unknown competition: {key}")
+    return COMPETITIONS[key]
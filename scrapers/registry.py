@@ -0,0 +1,58 @@
+from dataclasses import dataclass, field
+
+from scrapers.leagues import FBREF_BASE_URL, COMPETITIONS, DEFAULT_COMPETITION
+
+# Result columns every match-log page has; kept as floats so fixtures
+# that haven't been played yet (blank scores) don't change the column type
+SCORE_DTYPES = {'GF': 'float64', 'GA': 'float64'}
+
+
+@dataclass(frozen=True)
+class CategorySpec:
+    """How to scrape one stat category from FBref's team match logs, in any competition."""
+    kind: str
+    url_path: str
+    url_suffix: str = 'Match-Logs'
+    table_id: str = 'matchlogs_for'
+    # Keep columns up to and including this one; None drops the trailing "Match Report" column
+    last_column: tuple = None
+    dtypes: dict = field(default_factory=lambda: dict(SCORE_DTYPES))
+    has_against: bool = True
+
+    def url(self, squad_id, year, team, competition):
+        return (f'{FBREF_BASE_URL}/en/squads/{squad_id}/{year}/matchlogs/{competition.matchlogs_id}/'
+                f'{self.url_path}/{team.replace(" ", "-")}-{self.url_suffix}-{competition.slug}')
+
+
+CATEGORY_SPECS = {spec.kind: spec for spec in (
+    CategorySpec('stats', 'schedule', url_suffix='Scores-and-Fixtures', has_against=False),
+    CategorySpec('shooting', 'shooting'),
+    CategorySpec('goalshot', 'shooting'),
+    CategorySpec('keeper', 'keeper'),
+    CategorySpec('passing', 'passing'),
+    CategorySpec('passtypes', 'passing_types'),
+    CategorySpec('possession', 'possession'),
+    CategorySpec('defensive', 'defense', last_column=('Unnamed: 24_level_0', 'Err')),
+    CategorySpec('misc', 'misc'),
+)}
+
+
+def category_name(competition_key, kind):
+    """Stat categories are stored as "<competition>_<kind>", e.g. "laliga_shooting"."""
+    return f"{competition_key}_{kind}"
+
+
+def categories_for(competition_key):
+    return [category_name(competition_key, kind) for kind in CATEGORY_SPECS]
+
+
+def get_category(name):
+    """Resolve a stat category name to its (Competition, CategorySpec)."""
+    competition_key, _, kind = name.partition('_')
+    if competition_key not in COMPETITIONS or kind not in CATEGORY_SPECS:
+        raise ValueError(f"Unknown stat category: {name}")
+    return COMPETITIONS[competition_key], CATEGORY_SPECS[kind]
+
+
+# La Liga categories, the ones the dashboard and existing collections use
+CATEGORIES = {category_name(DEFAULT_COMPETITION, kind): spec for kind, spec in CATEGORY_SPECS.items()}
@@ -0,0 +1,99 @@
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+# Canonical names of the columns that are not numbers
+DATE_COLUMNS = {'date'}
+TEXT_COLUMNS = {
+    'time', 'comp', 'round', 'day', 'venue', 'result', 'opponent', 'captain',
+    'formation', 'opp_formation', 'referee', 'match_report', 'notes',
+}
+# Fields added by storage rather than scraped; left as they are
+RESERVED_COLUMNS = {'_id', 'last_updated', 'row_hash', 'season', 'team'}
+
+SYMBOLS = [('1/3', ' final third '), ('+/-', ' plus minus '), ('%', ' pct'),
+           ('/', ' per '), ('+', ' plus '), ('#', ' num ')]
+
+
+def _is_team_group(group):
+    """Header groups that name the team ("For Barcelona") or are blank carry no meaning."""
+    return not group or group.startswith(('For ', 'Against ', 'Unnamed:'))
+
+
+def _snake(text):
+    for symbol, word in SYMBOLS:
+        text = text.replace(symbol, word)
+    return re.sub(r'[^0-9a-zA-Z]+', '_', text).strip('_').lower()
+
+
+def _split(column):
+    """Return (group, header) of a MultiIndex tuple or a flattened "Group_Header" name."""
+    if isinstance(column, tuple):
+        return (column[0], column[-1]) if len(column) > 1 else ('', column[0])
+    group, _, header = str(column).rpartition('_')
+    return group, header
+
+
+def canonical_name(column):
+    """Stable snake_case name of an FBref column, the same for every team.
+
+    ('For Barcelona', 'Date') and 'For Barcelona_Date' give 'date',
+    ('Standard', 'SoT%') gives 'standard_sot_pct'. Canonical names map to themselves.
+    """
+    if column in RESERVED_COLUMNS:
+        return column
+    group, header = _split(column)
+    if _is_team_group(group):
+        group = ''
+    return _snake(f'{group} {header}')
+
+
+def _neutral(column):
+    if column in RESERVED_COLUMNS:
+        return column
+    group, header = _split(column)
+    return ('', header) if _is_team_group(group) else column
+
+
+@lru_cache(maxsize=None)
+def _canonical_names(columns):
+    names = []
+    seen = {}
+    for column in columns:
+        name = canonical_name(column)
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f'{name}_{seen[name]}')
+    return tuple(names)
+
+
+def normalize_columns(df):
+    """Rename a table's columns to their canonical names.
+
+    The mapping is worked out once per header layout; team groups are
+    blanked first so every team of a category shares the cached mapping.
+    """
+    neutral = tuple(_neutral(column) for column in df.columns)
+    df = df.copy(deep=False)
+    df.columns = list(_canonical_names(neutral))
+    return df
+
+
+def coerce_columns(df):
+    """Type canonical columns a whole column at a time: dates, text, and numbers everywhere else."""
+    for column in df.columns:
+        values = df[column]
+        if column in DATE_COLUMNS:
+            df[column] = pd.to_datetime(values, errors='coerce')
+        elif column in TEXT_COLUMNS or column in RESERVED_COLUMNS:
+            continue
+        elif not pd.api.types.is_numeric_dtype(values):
+            numeric = pd.to_numeric(values, errors='coerce')
+            if numeric.notna().sum() == values.notna().sum():
+                df[column] = numeric
+    return df
+
+
+def normalize(df):
+    """Canonical column names and types for a scraped match-log table."""
+    return coerce_columns(normalize_columns(df))
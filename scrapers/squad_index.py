@@ -0,0 +1,106 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from scrapers.leagues import DEFAULT_COMPETITION, get_competition
+from scrapers.squads import SQUAD_IDS
+from utils.page_cache import fetch_page, ttl_for_url, FINISHED_SEASON_TTL
+
+logger = logging.getLogger(__name__)
+
+SQUAD_INDEX_PATH = os.getenv("FBREF_SQUAD_INDEX", ".squad_index.json")
+# How often the squad list of a season that is still being played is rebuilt
+SQUAD_INDEX_TTL = 7 * 24 * 60 * 60
+
+SQUAD_LINK_PATTERN = re.compile(r'href="/en/squads/([0-9a-f]{8})/(?:\d{4}-\d{4}/)?([^"/]+)-Stats"')
+
+_lock = threading.Lock()
+_index = None
+
+
+def _load():
+    global _index
+    if _index is None:
+        try:
+            with open(SQUAD_INDEX_PATH, "r", encoding="utf-8") as f:
+                _index = json.load(f)
+        except (OSError, ValueError):
+            _index = {}
+    return _index
+
+
+def _save(index):
+    tmp_path = f"{SQUAD_INDEX_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, SQUAD_INDEX_PATH)
+
+
+def parse_squads(page):
+    """Return {team name: squad id} from the squad links of a competition page."""
+    squads = {}
+    for squad_id, slug in SQUAD_LINK_PATTERN.findall(page):
+        squads.setdefault(slug.replace("-", " "), squad_id)
+    return squads
+
+
+def _is_stale(entry, url):
+    if ttl_for_url(url) == FINISHED_SEASON_TTL:
+        return False  # A finished season's squad list never changes
+    return time.time() - entry.get("fetched_at", 0) > SQUAD_INDEX_TTL
+
+
+def get_squads(competition_key, season, refresh=False):
+    """Return {team: squad id} for a competition season, building it from FBref if needed.
+
+    Only missing or stale (competition, season) entries are fetched; the
+    result is kept in a local JSON index.
+    """
+    competition = get_competition(competition_key)
+    url = competition.season_url(season)
+
+    with _lock:
+        index = _load()
+        entry = index.get(competition_key, {}).get(season)
+        if entry and not refresh and not _is_stale(entry, url):
+            return dict(entry["squads"])
+
+    try:
+        squads = parse_squads(fetch_page(url))
+    except Exception as e:
+        logger.error(f"Could not build squad index for {competition_key} {season}: {e}")
+        squads = {}
+
+    if not squads:
+        if entry:
+            return dict(entry["squads"])
+        return dict(SQUAD_IDS) if competition_key == DEFAULT_COMPETITION else {}
+
+    with _lock:
+        index = _load()
+        index.setdefault(competition_key, {})[season] = {"fetched_at": time.time(), "squads": squads}
+        _save(index)
+    logger.info(f"Indexed {len(squads)} squads for {competition_key} {season}")
+    return dict(squads)
+
+
+def find_squad_id(team, competition_key=DEFAULT_COMPETITION, season=None):
+    """Look a team's squad id up without touching the network when possible."""
+    if competition_key == DEFAULT_COMPETITION and team in SQUAD_IDS:
+        return SQUAD_IDS[team]
+
+    with _lock:
+        seasons = _load().get(competition_key, {})
+        for entry in seasons.values():
+            if team in entry["squads"]:
+                return entry["squads"][team]
+
+    if season is not None:
+        squads = get_squads(competition_key, season)
+        if team in squads:
+            return squads[team]
+
+    raise ValueError(f"No squad ID found for team: {team}")
@@ -0,0 +1,26 @@
+# Dictionary of Squad IDs for teams
+SQUAD_IDS = {
+    "Real Madrid": "53a2f082",
+    "Barcelona": "206d90db",
+    "Atletico Madrid": "db3b9613",
+    "Valencia": "dcc91a7b",
+    "Athletic Club": "2b390eca",
+    "Rayo Vallecano": "98e8af82",
+    "Valladolid": "17859612",
+    "Girona": "9024a00a",
+    "Villarreal": "2a8183b3",
+    "Getafe": "7848bd64",
+    "Osasuna": "03c57e2b",
+    "Alaves": "8d6fd021",
+    "Sevilla": "ad2be733",
+    "Espanyol": "a8661628",
+    "Real Sociedad": "e31d1cd9",
+    "Celta Vigo": "f25da7fb",
+    "Las Palmas": "0049d422",
+    "Mallorca": "2aa12281",
+    "Real Betis": "fc536746",
+    "Leganes": "7c6f2c78",
+    "Almeria": "78ecf4bb",
+    "Cadiz": "ee7c297c",
+    "Granada": "a0435291"
+}
@@ -0,0 +1,122 @@
+import pandas as pd
+import pytest
+
+import db
+
+
+@pytest.fixture
+def client(monkeypatch):
+    mongomock = pytest.importorskip("mongomock")
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(db, "_client", client)
+    monkeypatch.setattr(db, "STORAGE_MODE", "per_team")
+    monkeypatch.setattr(db, "_indexed_categories", set())
+    monkeypatch.setattr(db.warehouse, "WAREHOUSE_DIR", None)
+    return client
+
+
+def _matches(**columns):
+    data = {
+        "date": pd.to_datetime(["2023-08-13", "2023-08-20"]),
+        "opponent": ["Getafe", "Cádiz"],
+        "standard_gls": [0.0, 2.0],
+    }
+    data.update(columns)
+    return pd.DataFrame(data)
+
+
+def _write(df):
+    return db.update_data(df, "2023-2024", "Barcelona", "laliga_shooting", "2023-2024")
+
+
+def _stored(client):
+    collection = client["football_2023-2024"]["Barcelona_laliga_shooting_2023-2024"]
+    return {doc["_id"]: doc for doc in collection.find()}
+
+
+def test_hash_rows_ignore_the_index_and_follow_the_values():
+    df = _matches()
+    assert db.hash_rows(df) == db.hash_rows(df.set_axis([10, 11]))
+    changed = df.copy()
+    changed.loc[1, "standard_gls"] = 3.0
+    assert db.hash_rows(changed)[0] == db.hash_rows(df)[0]
+    assert db.hash_rows(changed)[1] != db.hash_rows(df)[1]
+
+
+def test_hash_rows_change_when_a_column_is_renamed():
+    df = _matches()
+    renamed = df.rename(columns={"standard_gls": "standard_goals"})
+    assert all(a != b for a, b in zip(db.hash_rows(df), db.hash_rows(renamed)))
+
+
+def test_update_data_inserts_then_skips_an_unchanged_table(client):
+    assert _write(_matches()) == {"inserted": 2, "updated": 0, "unchanged": 0}
+    assert _write(_matches()) == {"inserted": 0, "updated": 0, "unchanged": 2}
+    assert set(_stored(client)) == {"2023-08-13_Getafe", "2023-08-20_Cádiz"}
+
+
+def test_update_data_rewrites_only_changed_rows(client):
+    _write(_matches())
+    assert _write(_matches(standard_gls=[0.0, 3.0])) == {"inserted": 0, "updated": 1, "unchanged": 1}
+    assert _stored(client)["2023-08-20_Cádiz"]["standard_gls"] == 3.0
+
+
+def test_update_data_rewrites_rows_of_a_renamed_column(client):
+    _write(_matches())
+    renamed = _matches().rename(columns={"standard_gls": "standard_goals"})
+    assert _write(renamed) == {"inserted": 0, "updated": 2, "unchanged": 0}
+    for doc in _stored(client).values():
+        assert "standard_goals" in doc and "standard_gls" not in doc
+
+
+def test_update_data_skips_rows_without_a_match(client):
+    df = pd.concat([_matches(), pd.DataFrame({"date": [pd.NaT], "opponent": [None], "standard_gls": [5.0]})],
+                   ignore_index=True)
+    assert _write(df)["inserted"] == 2
+    assert len(_stored(client)) == 2
+
+
+def test_update_data_unified_mode(client, monkeypatch):
+    monkeypatch.setattr(db, "STORAGE_MODE", "unified")
+    assert _write(_matches())["inserted"] == 2
+    doc = client["football"]["matchlogs_laliga_shooting"].find_one({"opponent": "Getafe"})
+    assert doc["_id"] == "2023-2024_Barcelona_2023-08-13_Getafe"
+    assert (doc["season"], doc["team"]) == ("2023-2024", "Barcelona")
+
+
+def test_failed_warehouse_append_is_flagged_and_re_exported(client, monkeypatch, tmp_path):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(db.warehouse, "WAREHOUSE_DIR", str(tmp_path))
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(db.warehouse, "append_rows", fail)
+        _write(_matches())
+    metadata = db.get_metadata_collection()
+    assert metadata.find_one({"team": "Barcelona"})["warehouse_pending"] is True
+
+    # mongomock has no find_raw_batches, which load_matchlogs_frame reads with
+    monkeypatch.setattr(db, "load_matchlogs_frame", lambda *args, **kwargs: _matches())
+    assert db.warehouse.sync_pending() == 1
+    assert metadata.find_one({"team": "Barcelona"})["warehouse_pending"] is False
+    stored = db.warehouse.read_warehouse(season="2023-2024", team="Barcelona")
+    assert sorted(stored["opponent"]) == ["Cádiz", "Getafe"]
+
+
+def test_match_ids():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2023-08-13", None, "2023-08-27", "2023-09-03"]),
+        "opponent": ["Getafe", "Cádiz", None, ""],
+    })
+    ids = db.match_ids(df, "2023-2024", "Barcelona")
+    assert ids[0] == "2023-08-13_Getafe"
+    assert ids[1:].isna().all()
+    assert db.match_ids(df, "2023-2024", "Barcelona", unified=True)[0] == "2023-2024_Barcelona_2023-08-13_Getafe"
+
+
+def test_match_ids_without_date_or_opponent_columns():
+    df = _matches()
+    assert db.match_ids(df[["date"]], "2023-2024", "Barcelona").isna().all()
+    assert db.match_ids(df[["opponent"]], "2023-2024", "Barcelona").isna().all()
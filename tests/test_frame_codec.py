@@ -0,0 +1,37 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from db import hash_rows
+from utils.frame_codec import decode_frame, encode_frame
+
+
+def _round_trip(df):
+    return decode_frame(pickle.loads(pickle.dumps(encode_frame(df))))
+
+
+def test_round_trip_keeps_values_dtypes_and_row_hashes():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2023-08-13", None]),
+        "opponent": pd.Series(["Getafe", None], dtype=object),
+        "round": pd.Series(["Matchweek 1", np.nan], dtype=object),
+        "standard_gls": [0, 2],
+        "standard_dist": [17.3, np.nan],
+        "notes": pd.Series([None, None], dtype=object),
+        "mixed": pd.Series(["x", 1], dtype=object),
+    })
+    decoded = _round_trip(df)
+    pd.testing.assert_frame_equal(decoded, df)
+    assert hash_rows(decoded) == hash_rows(df)
+
+
+def test_round_trip_keeps_parsed_headers():
+    columns = pd.MultiIndex.from_tuples([("For Barcelona", "Date"), ("Total", "Cmp"), ("Total", "Cmp")])
+    df = pd.DataFrame([["2023-08-13", 1, 2], ["2023-08-20", 3, 4]], columns=columns)
+    pd.testing.assert_frame_equal(_round_trip(df), df)
+
+
+def test_round_trip_of_an_empty_table():
+    df = pd.DataFrame({"date": pd.Series([], dtype="datetime64[ns]"), "opponent": pd.Series([], dtype=object)})
+    pd.testing.assert_frame_equal(_round_trip(df), df)
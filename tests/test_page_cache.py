@@ -0,0 +1,88 @@
+import contextlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from utils import page_cache
+from utils.page_cache import PageCache, fetch_page
+
+
+class _Handler(BaseHTTPRequestHandler):
+    body = b"<html>v1</html>"
+    etag = '"v1"'
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append(self.headers.get("If-None-Match"))
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # The rate limiter is not under test; let every request through at once
+    monkeypatch.setattr(page_cache, "rate_limited", lambda url: contextlib.nullcontext())
+    handler = type("Handler", (_Handler,), {"requests": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield handler, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_fresh_pages_come_from_the_cache(server, tmp_path):
+    handler, base = server
+    cache = PageCache(str(tmp_path))
+    assert fetch_page(f"{base}/page", cache=cache) == "<html>v1</html>"
+    assert fetch_page(f"{base}/page", cache=cache) == "<html>v1</html>"
+    assert handler.requests == [None]
+
+
+def test_stale_pages_are_revalidated_with_a_conditional_get(server, tmp_path):
+    handler, base = server
+    cache = PageCache(str(tmp_path))
+    fetch_page(f"{base}/page", cache=cache)
+    assert fetch_page(f"{base}/page", ttl=0, cache=cache) == "<html>v1</html>"
+    assert handler.requests == [None, '"v1"']
+    assert cache.validators(f"{base}/page")["etag"] == '"v1"'
+
+
+def test_changed_pages_replace_the_cached_copy(server, tmp_path):
+    handler, base = server
+    cache = PageCache(str(tmp_path))
+    fetch_page(f"{base}/page", cache=cache)
+    handler.body, handler.etag = b"<html>v2</html>", '"v2"'
+    assert fetch_page(f"{base}/page", ttl=0, cache=cache) == "<html>v2</html>"
+    assert cache.get(f"{base}/page")["etag"] == '"v2"'
+
+
+def test_errors_are_raised_and_not_cached(server, tmp_path):
+    _, base = server
+    cache = PageCache(str(tmp_path))
+    with pytest.raises(requests.HTTPError):
+        fetch_page(f"{base}/missing", cache=cache)
+    assert cache.get(f"{base}/missing") is None
+
+
+def test_eviction_keeps_the_cache_under_its_size(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=25)
+    cache.put("http://x/a", "a" * 10)
+    cache.put("http://x/b", "b" * 10)
+    cache.get("http://x/a")
+    cache.put("http://x/c", "c" * 10)
+    assert cache.get("http://x/b") is None
+    assert cache.get("http://x/a") is not None and cache.get("http://x/c") is not None
@@ -0,0 +1,74 @@
+import pytest
+import requests
+
+from utils import scraper_utils
+from utils.rate_limit import MAX_BACKOFF, TokenBucket, backoff_delay, is_retryable, parse_retry_after
+from utils.scraper_utils import retry_on_failure
+
+
+def _http_error(status, retry_after=None):
+    response = requests.Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return requests.HTTPError(response=response)
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (requests.ConnectionError(), True),
+    (requests.Timeout(), True),
+    (_http_error(429), True),
+    (_http_error(503), True),
+    (_http_error(404), False),
+    (_http_error(403), False),
+    (requests.HTTPError(), False),
+    (ValueError("No tables found"), False),
+])
+def test_is_retryable(error, retryable):
+    assert is_retryable(error) is retryable
+
+
+def test_backoff_grows_exponentially_with_jitter():
+    for attempt in range(4):
+        delays = [backoff_delay(attempt, 5) for _ in range(200)]
+        assert all(0 <= delay <= 5 * 2 ** attempt for delay in delays)
+    assert all(backoff_delay(10, 5) <= MAX_BACKOFF for _ in range(50))
+
+
+def test_backoff_follows_retry_after():
+    assert backoff_delay(0, 5, _http_error(429, "30")) == 30
+    assert backoff_delay(0, 5, _http_error(429, "9999")) == MAX_BACKOFF
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
+
+
+def test_retry_on_failure_retries_only_retryable_errors(monkeypatch):
+    monkeypatch.setattr(scraper_utils.time, "sleep", lambda seconds: None)
+    attempts = []
+
+    @retry_on_failure(max_retries=3, delay=1)
+    def flaky(error):
+        attempts.append(error)
+        if len(attempts) < 3:
+            raise error
+        return "ok"
+
+    assert flaky(requests.ConnectionError()) == "ok"
+    assert len(attempts) == 3
+
+    attempts.clear()
+    with pytest.raises(ValueError):
+        flaky(ValueError("bad table"))
+    assert len(attempts) == 1
+
+
+def test_throttling_halves_the_rate_and_success_recovers_it():
+    bucket = TokenBucket(rate=1.0, capacity=2, min_rate=0.3)
+    bucket.penalize()
+    assert bucket.rate == 0.5
+    bucket.penalize()
+    bucket.penalize()
+    assert bucket.rate == 0.3
+    for _ in range(20):
+        bucket.reward()
+    assert bucket.rate == 1.0
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from scrapers.schema import canonical_name, normalize, normalize_columns
+
+
+@pytest.mark.parametrize("column, name", [
+    (("For Barcelona", "Date"), "date"),
+    ("For Barcelona_Date", "date"),
+    (("Against Barcelona", "Opponent"), "opponent"),
+    (("Unnamed: 3_level_0", "Opponent"), "opponent"),
+    (("Standard", "SoT%"), "standard_sot_pct"),
+    (("Expected", "npxG/Sh"), "expected_npxg_per_sh"),
+    (("", "1/3"), "final_third"),
+    (("Performance", "PSxG+/-"), "performance_psxg_plus_minus"),
+    (("Sweeper", "#OPA"), "sweeper_num_opa"),
+    ("_id", "_id"),
+])
+def test_canonical_name(column, name):
+    assert canonical_name(column) == name
+    assert canonical_name(name) == name
+
+
+def test_every_team_gets_the_same_names():
+    for team in ("Barcelona", "Girona"):
+        df = pd.DataFrame([[1, 2]], columns=pd.MultiIndex.from_tuples([(f"For {team}", "Date"), ("Standard", "Gls")]))
+        assert list(normalize_columns(df).columns) == ["date", "standard_gls"]
+
+
+def test_duplicate_names_are_numbered():
+    df = pd.DataFrame([[1, 2, 3]], columns=pd.MultiIndex.from_tuples(
+        [("For Barcelona", "Date"), ("Total", "Cmp"), ("Total", "Cmp")]))
+    assert list(normalize_columns(df).columns) == ["date", "total_cmp", "total_cmp_2"]
+
+
+def test_normalize_types_dates_text_and_numbers():
+    df = pd.DataFrame({"For Barcelona_Date": ["2023-08-13", "2023-08-20"], "For Barcelona_Round": ["1", "2"],
+                       "Standard_Gls": ["0", "2"], "Standard_Dist": ["17.3", "n/a"]})
+    df = normalize(df)
+    assert pd.api.types.is_datetime64_any_dtype(df["date"])
+    assert list(df["round"]) == ["1", "2"]
+    assert list(df["standard_gls"]) == [0, 2]
+    assert df["standard_dist"].tolist() == ["17.3", "n/a"]
@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from utils.single_flight import SingleFlight, current_run, fetch_run
+
+
+def test_concurrent_callers_share_one_call():
+    run = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "page"
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(run.do("key", fetch)))
+    owner.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(run.do("key", fetch))) for _ in range(3)]
+    for thread in waiters:
+        thread.start()
+    release.set()
+    for thread in [owner] + waiters:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["page"] * 4
+    assert run.hits == 3
+
+
+def test_results_are_kept_for_later_callers():
+    run = SingleFlight()
+    assert run.do("key", lambda: 1) == 1
+    assert run.do("key", lambda: 2) == 1
+
+
+def test_unkept_results_are_dropped_once_finished():
+    run = SingleFlight()
+    assert run.do("page", lambda: "old", keep=False) == "old"
+    assert run.do("page", lambda: "new", keep=False) == "new"
+
+
+def test_failed_calls_are_retried():
+    run = SingleFlight()
+    with pytest.raises(ZeroDivisionError):
+        run.do("key", lambda: 1 / 0)
+    assert run.do("key", lambda: 1) == 1
+
+
+def test_nested_fetch_runs_share_the_outer_run():
+    assert current_run() is None
+    with fetch_run() as outer:
+        with fetch_run() as inner:
+            assert inner is outer is current_run()
+    assert current_run() is None
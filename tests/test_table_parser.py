@@ -0,0 +1,59 @@
+from io import StringIO
+
+import pandas as pd
+import pytest
+
+from utils.table_parser import find_table_html, parse_table, parse_tables
+
+
+def _table(table_id, group):
+    return f"""<table class="stats_table" id="{table_id}">
+<thead>
+<tr><th colspan="4">{group}</th><th colspan="3">Standard</th><th></th></tr>
+<tr><th>Date</th><th>Venue</th><th>Result</th><th>Opponent</th>
+<th>Gls</th><th>SoT%</th><th>Dist</th><th>Match Report</th></tr>
+</thead>
+<tbody>
+<tr><th scope="row">2023-08-13</th><td>Away</td><td>D 0–0</td><td>Getafe</td>
+<td>0</td><td>25.0</td><td>1,234</td><td><a href="/report">Match Report</a></td></tr>
+<tr><th scope="row">2023-08-20</th><td>Home</td><td>W 2–0</td><td>Cádiz</td>
+<td>2</td><td></td><td>17.3</td><td>Match Report</td></tr>
+</tbody>
+<tfoot><tr><th></th><td></td><td></td><td></td><td>2</td><td>30.0</td><td>18.1</td><td></td></tr></tfoot>
+</table>"""
+
+
+PAGE = ("<html><body><div>navigation</div>" + _table("matchlogs_for", "For Barcelona")
+        + "<!--\n" + _table("matchlogs_against", "Against Barcelona") + "\n--></body></html>")
+
+
+def _read_html(table_html):
+    return pd.read_html(StringIO(table_html))[0]
+
+
+def test_parser_matches_read_html():
+    expected = _read_html(find_table_html(PAGE, "matchlogs_for"))
+    pd.testing.assert_frame_equal(parse_table(PAGE, "matchlogs_for"), expected)
+
+
+@pytest.mark.parametrize("cells", [
+    ["1", "2"],
+    ["1,234", "-5"],
+    ["100.0", "50.0"],
+    ["1e3", "2"],
+    ["inf", "3"],
+    ["1", ""],
+    ["1.5", "Away"],
+])
+def test_column_types_match_read_html(cells):
+    rows = "".join(f"<tr><th>{i}</th><td>{cell}</td></tr>" for i, cell in enumerate(cells))
+    table_html = f'<table id="t"><thead><tr><th>Match</th><th>Save%</th></tr></thead><tbody>{rows}</tbody></table>'
+    pd.testing.assert_frame_equal(parse_table(table_html, "t"), _read_html(table_html))
+
+
+def test_parser_reads_tables_inside_comments():
+    tables = parse_tables(PAGE, ["matchlogs_for", "matchlogs_against", "missing"])
+    assert set(tables) == {"matchlogs_for", "matchlogs_against"}
+    assert tables["matchlogs_against"].columns[0] == ("Against Barcelona", "Date")
+    with pytest.raises(ValueError):
+        parse_table(PAGE, "missing")
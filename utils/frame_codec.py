@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+
+def _missing_marker(values):
+    """Return how an object column marks missing cells (None or NaN), or False when it mixes both."""
+    missing = values[values.isna()]
+    has_none = any(value is None for value in missing)
+    if has_none and len(missing) > sum(value is None for value in missing):
+        return False
+    return None if has_none else np.nan
+
+
+def _travels_as_is(values):
+    # Arrow can't type object columns mixing text and numbers, nor keep None apart from NaN
+    if values.dtype != object:
+        return False
+    return (pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty")
+            or _missing_marker(values) is False)
+
+
+def encode_frame(df):
+    """Pack a DataFrame as an Arrow IPC stream that pickles compactly between processes.
+
+    Every column travels as contiguous Arrow buffers, so no Python object
+    per cell crosses the process boundary. Object columns mixing text and
+    numbers, which Arrow cannot type, are rare and sent as they are. Column
+    labels (MultiIndex headers, duplicates) are sent apart from the stream.
+    """
+    import pyarrow as pa
+
+    flat = df.set_axis([str(i) for i in range(df.shape[1])], axis=1)
+    as_is = {key: flat[key].to_numpy() for key in flat.columns if _travels_as_is(flat[key])}
+    # Object text columns come back object, with missing cells as they were
+    markers = {key: _missing_marker(flat[key]) for key in flat.columns
+               if flat[key].dtype == object and key not in as_is}
+    table = pa.Table.from_pandas(flat.drop(columns=list(as_is)), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return df.columns, sink.getvalue().to_pybytes(), as_is, markers
+
+
+def decode_frame(packed):
+    """Rebuild the DataFrame packed by encode_frame, with its original columns and dtypes."""
+    import pyarrow as pa
+
+    columns, stream, as_is, markers = packed
+    df = pa.ipc.open_stream(stream).read_all().to_pandas()
+    for key, values in as_is.items():
+        df[key] = values
+    df = df[[str(i) for i in range(len(columns))]]
+    for key, marker in markers.items():
+        values = df[key].astype(object)
+        df[key] = values.where(values.notna(), marker)
+    df.columns = columns
+    return df
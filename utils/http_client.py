@@ -0,0 +1,53 @@
+import importlib
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CONNECT_TIMEOUT = float(os.getenv("FBREF_CONNECT_TIMEOUT", 10))
+READ_TIMEOUT = float(os.getenv("FBREF_READ_TIMEOUT", 30))
+POOL_SIZE = int(os.getenv("FBREF_POOL_SIZE", 10))
+
+USER_AGENT = "Mozilla/5.0 (compatible; laliga-fbref-scraper)"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _accept_encoding():
+    """Advertise brotli only when urllib3 can decode it."""
+    for module in ("brotli", "brotlicffi"):
+        try:
+            importlib.import_module(module)
+            return "br, gzip, deflate"
+        except ImportError:
+            continue
+    return "gzip, deflate"
+
+
+def get_session():
+    """Return the process-wide session with pooled keep-alive connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "User-Agent": USER_AGENT,
+                "Accept-Encoding": _accept_encoding(),
+            })
+            _session = session
+    return _session
+
+
+def get(url, headers=None, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+    """GET a URL over a pooled connection.
+
+    Safe to call from many threads at once: the scrapers' thread pools are
+    how requests run concurrently, all sharing this one session.
+    """
+    return get_session().get(url, headers=headers, timeout=(connect_timeout, read_timeout))
+
@@ -0,0 +1,22 @@
+import logging
+import os
+
+LOG_FILE = os.getenv("FBREF_LOG_FILE", "scraper.log")
+
+_configured = False
+
+
+def configure_logging(level=logging.INFO, log_file=LOG_FILE):
+    """Log to the console and to log_file. Called by entry points, not on import, and only once."""
+    global _configured
+    if _configured:
+        return
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+    _configured = True
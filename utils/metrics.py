@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Serve /metrics on this port (worker and scheduler) and/or write the metrics to this file
+METRICS_PORT = int(os.getenv("FBREF_METRICS_PORT", 0))
+METRICS_FILE = os.getenv("FBREF_METRICS_FILE")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HELP = {
+    "fbref_stage_duration_seconds": "Time spent in each pipeline stage",
+    "fbref_bytes_downloaded_total": "Response body bytes downloaded from FBref",
+    "fbref_http_responses_total": "HTTP responses received, by status code",
+    "fbref_page_cache_total": "Page cache lookups, by result",
+    "fbref_single_flight_hits_total": "Fetches and parses shared with an identical call in the same run",
+    "fbref_retries_total": "Retried scrape attempts",
+    "fbref_throttled_total": "Responses that made the rate limiter slow down",
+    "fbref_documents_total": "Match documents written, by result",
+    "fbref_scrapes_total": "Scrape jobs, by outcome",
+}
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    """Add to a counter."""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """Record one observation of a histogram."""
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {"buckets": [0] * len(DURATION_BUCKETS), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                histogram["buckets"][i] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+
+@contextmanager
+def span(stage, **labels):
+    """Time a block as one observation of fbref_stage_duration_seconds{stage=...}."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("fbref_stage_duration_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+
+def timed(stage):
+    """Decorator form of span()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    return "{%s}" % ",".join(
+        '%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in items
+    )
+
+
+def render():
+    """Return every metric in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: {"buckets": list(h["buckets"]), "sum": h["sum"], "count": h["count"]}
+                      for key, h in _histograms.items()}
+
+    lines = []
+    for metric_type, metrics in (("counter", counters), ("histogram", histograms)):
+        for name in sorted({name for name, _ in metrics}):
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (metric, labels), value in sorted(metrics.items()):
+                if metric != name:
+                    continue
+                if metric_type == "counter":
+                    lines.append(f"{name}{_labels(labels)} {value}")
+                    continue
+                for bound, count in zip(DURATION_BUCKETS, value["buckets"]):
+                    lines.append(f"{name}_bucket{_labels(labels, le=bound)} {count}")
+                lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {value["count"]}')
+                lines.append(f"{name}_sum{_labels(labels)} {value['sum']}")
+                lines.append(f"{name}_count{_labels(labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_file(path=None):
+    """Write the metrics to METRICS_FILE (e.g. for node_exporter's textfile collector)."""
+    path = path or METRICS_FILE
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=None):
+    """Expose /metrics over HTTP from a daemon thread; does nothing when no port is configured."""
+    port = port or METRICS_PORT
+    if not port:
+        return None
+    server = ThreadingHTTPServer(("", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 Metrics available on http://localhost:{port}/metrics")
+    return server
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from utils import http_client, metrics
+from utils.rate_limit import rate_limited, record_response
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("FBREF_CACHE_DIR", ".page_cache")
+CACHE_MAX_BYTES = int(os.getenv("FBREF_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+DEFAULT_TTL = int(os.getenv("FBREF_CACHE_TTL", 6 * 60 * 60))  # 6 hours
+FINISHED_SEASON_TTL = 30 * 24 * 60 * 60  # 30 days
+SEASON_PATTERN = re.compile(r"/(\d{4})-(\d{4})/")
+
+def ttl_for_url(url):
+    """Pick a TTL for a page: finished seasons rarely change, so keep them longer."""
+    match = SEASON_PATTERN.search(url)
+    if match:
+        end_year = int(match.group(2))
+        now = datetime.now()
+        if (now.year, now.month) > (end_year, 7):
+            return FINISHED_SEASON_TTL
+    return DEFAULT_TTL
+
+
+class PageCache:
+    """On-disk page cache keyed by a hash of the URL with LRU eviction by size."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return f"{base}.html", f"{base}.json"
+
+    def _write_atomic(self, path, payload):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta_path, meta):
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def get(self, url):
+        """Return the cached entry for a URL (metadata plus body) or None."""
+        body_path, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path)
+        if meta is None:
+            return None
+        try:
+            with open(body_path, "rb") as f:
+                body = f.read().decode("utf-8")
+        except OSError:
+            return None
+
+        meta["last_access"] = time.time()
+        self._write_meta(meta_path, meta)
+        meta["body"] = body
+        return meta
+
+    def validators(self, url):
+        """Return the stored ETag/Last-Modified of a page without touching its LRU position."""
+        _, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path) or {}
+        return {"etag": meta.get("etag"), "last_modified": meta.get("last_modified")}
+
+    def is_fresh(self, entry, ttl=None):
+        """Check an entry against its stored TTL, or against `ttl` for this lookup only."""
+        if ttl is None:
+            ttl = entry.get("ttl", DEFAULT_TTL)
+        return time.time() - entry["fetched_at"] < ttl
+
+    def put(self, url, body, headers=None, ttl=None):
+        """Store a page body with its HTTP validators."""
+        headers = headers or {}
+        body_path, meta_path = self._paths(url)
+        payload = body.encode("utf-8")
+        now = time.time()
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": now,
+            "last_access": now,
+            "ttl": ttl if ttl is not None else ttl_for_url(url),
+            "size": len(payload),
+        }
+
+        with self._lock:
+            previous = self._read_meta(meta_path)
+            self._write_atomic(body_path, payload)
+            self._write_meta(meta_path, meta)
+            if self._total_bytes is not None:
+                self._total_bytes += meta["size"] - (previous or {}).get("size", 0)
+        self.evict()
+
+    def mark_revalidated(self, url, entry):
+        """Reset the fetch time of an entry after a 304 Not Modified."""
+        _, meta_path = self._paths(url)
+        meta = {k: v for k, v in entry.items() if k != "body"}
+        meta["fetched_at"] = time.time()
+        self._write_meta(meta_path, meta)
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                meta = self._read_meta(os.path.join(self.directory, name))
+                if meta:
+                    entries.append((name[:-5], meta))
+        return entries
+
+    def evict(self):
+        """Drop least recently used pages until the cache fits in max_bytes."""
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(meta.get("size", 0) for _, meta in self._scan())
+            if self._total_bytes <= self.max_bytes:
+                return
+
+            entries = sorted(self._scan(), key=lambda item: item[1].get("last_access", 0))
+            for key, meta in entries:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                base = os.path.join(self.directory, key)
+                for path in (f"{base}.html", f"{base}.json"):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                self._total_bytes -= meta.get("size", 0)
+                logger.info(f"Evicted cached page: {meta.get('url')}")
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PageCache()
+    return _default_cache
+
+
+def fetch_page(url, ttl=None, cache=None):
+    """Fetch a page through the cache, revalidating stale entries with a conditional GET.
+
+    `ttl` overrides how old a cached copy may be for this call; 0 always revalidates.
+    """
+    cache = cache or get_default_cache()
+    entry = cache.get(url)
+
+    if entry and cache.is_fresh(entry, ttl):
+        logger.info(f"Page cache hit: {url}")
+        metrics.inc("fbref_page_cache_total", result="hit")
+        return entry["body"]
+
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    with rate_limited(url), metrics.span("fetch"):
+        response = http_client.get(url, headers=headers)
+    record_response(response)
+    metrics.inc("fbref_http_responses_total", status=response.status_code)
+    metrics.inc("fbref_bytes_downloaded_total", len(response.content))
+
+    if response.status_code == 304 and entry:
+        logger.info(f"Page not modified, reusing cached copy: {url}")
+        metrics.inc("fbref_page_cache_total", result="revalidated")
+        cache.mark_revalidated(url, entry)
+        return entry["body"]
+
+    response.raise_for_status()
+    metrics.inc("fbref_page_cache_total", result="miss")
+    cache.put(url, response.text, response.headers)
+    return response.text
+
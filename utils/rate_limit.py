@@ -0,0 +1,137 @@
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+from utils import metrics
+
+# FBref bans clients that go above ~20 requests per minute
+REQUESTS_PER_MINUTE = float(os.getenv("FBREF_REQUESTS_PER_MINUTE", 10))
+BURST = int(os.getenv("FBREF_BURST", 2))
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("FBREF_MAX_CONNECTIONS_PER_HOST", 2))
+# Floor the adaptive rate drops to while FBref is throttling us
+MIN_REQUESTS_PER_MINUTE = float(os.getenv("FBREF_MIN_REQUESTS_PER_MINUTE", 2))
+MAX_BACKOFF = 120
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `capacity` stored.
+
+    The rate adapts: it is halved (down to `min_rate`) and paused for any
+    Retry-After when the server throttles, and creeps back up towards
+    `max_rate` with every successful response.
+    """
+
+    def __init__(self, rate, capacity, min_rate=None):
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                else:
+                    self._refill()
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self, retry_after=None):
+        """Slow down after a throttling response, pausing for retry_after seconds if given."""
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def reward(self):
+        """Recover a little of the configured rate after a successful response."""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+_bucket = TokenBucket(REQUESTS_PER_MINUTE / 60, BURST, min_rate=MIN_REQUESTS_PER_MINUTE / 60)
+_host_slots = defaultdict(lambda: threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST))
+_host_slots_lock = threading.Lock()
+
+
+def _host_semaphore(url):
+    host = urlparse(url).netloc
+    with _host_slots_lock:
+        return _host_slots[host]
+
+
+@contextmanager
+def rate_limited(url):
+    """Hold a connection slot for the URL's host and spend one token from the global bucket."""
+    with _host_semaphore(url):
+        _bucket.acquire()
+        yield
+
+
+def parse_retry_after(value):
+    """Return the delay in seconds from a Retry-After header (seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def record_response(response):
+    """Feed a response back to the shared bucket so the rate adapts to throttling."""
+    if response.status_code in (429, 503):
+        metrics.inc("fbref_throttled_total")
+        _bucket.penalize(parse_retry_after(response.headers.get("Retry-After")))
+    elif response.status_code < 400:
+        _bucket.reward()
+
+
+def is_retryable(error):
+    """Only network failures and throttling/server errors are worth retrying."""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def backoff_delay(attempt, base, error=None):
+    """Exponential backoff with full jitter, or the server's Retry-After when it sent one."""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        retry_after = parse_retry_after(error.response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, MAX_BACKOFF)
+    return random.uniform(0, min(MAX_BACKOFF, base * 2 ** attempt))
@@ -1,24 +1,33 @@
 import logging
-import pandas as pd
-from functools import wraps
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, wraps
 import time
 import importlib
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper.log'),
-        logging.StreamHandler()
-    ]
-)
+from utils import metrics
+from utils.frame_codec import decode_frame, encode_frame
+from utils.page_cache import fetch_page
+from utils.table_parser import parse_table, parse_tables
+from utils.single_flight import current_run
+from utils.rate_limit import is_retryable, backoff_delay
 
 logger = logging.getLogger(__name__)
 
+# Processes parsing pages inside fetch runs, leaving a core for fetching and writing;
+# 0 parses on the fetching thread
+PARSE_WORKERS = int(os.getenv("FBREF_PARSE_WORKERS", max((os.cpu_count() or 1) - 1, 0)))
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+@lru_cache(maxsize=None)
 def check_dependencies():
-    """Check if all required dependencies are installed"""
-    required_packages = ['pandas', 'lxml', 'requests', 'bs4']
+    """Check if all required dependencies are installed (once per process once they are)"""
+    required_packages = ['pandas', 'lxml', 'requests']
     missing_packages = []
     
     for package in required_packages:
@@ -33,11 +42,97 @@ def check_dependencies():
             f"Please install using: pip install {' '.join(missing_packages)}"
         )
 
-def safe_read_html(url, table_id):
-    """Safely read HTML table with proper error handling"""
+# Tables FBref serves together on every match-log page, parsed in one pass within a run
+BUNDLED_TABLE_IDS = ('matchlogs_for', 'matchlogs_against')
+
+def _fetch(url, ttl, run=None):
+    if run is None:
+        return fetch_page(url, ttl=ttl)
+    # Pages are only shared while downloading; the parsed tables are what the
+    # run keeps, and a later read of the page comes from the page cache
+    return run.do(('page', url), lambda: fetch_page(url, ttl=ttl), keep=False)
+
+def start_parse_pool(workers=PARSE_WORKERS):
+    """Start a process pool for parsing; forkserver/spawn, since the callers already run threads."""
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+def get_parse_pool():
+    """Return the process-wide parse pool, started on first use; None when PARSE_WORKERS is 0."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None and PARSE_WORKERS > 0:
+            _parse_pool = start_parse_pool()
+    return _parse_pool
+
+def _discard_parse_pool(pool):
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def parse_tables_packed(page, table_ids):
+    """parse_tables for a pool process, with every table packed by encode_frame."""
+    return {table_id: encode_frame(df) for table_id, df in parse_tables(page, table_ids).items()}
+
+def _parse_tables(page, table_ids, run=None):
+    """Parse on the process pool inside a fetch run, so a batch's parses use every core.
+
+    A pool broken by a dead process is dropped (the next parse starts a new
+    one) and this page is parsed on the calling thread instead.
+    """
+    pool = get_parse_pool() if run is not None else None
+    if pool is None:
+        return parse_tables(page, table_ids)
+    try:
+        packed = pool.submit(parse_tables_packed, page, tuple(table_ids)).result()
+    except BrokenProcessPool:
+        logger.warning("Parse pool broke; parsing on this thread")
+        _discard_parse_pool(pool)
+        return parse_tables(page, table_ids)
+    return {table_id: decode_frame(table) for table_id, table in packed.items()}
+
+def _read_table(url, table_id, ttl, run=None):
+    page = _fetch(url, ttl, run)
+    with metrics.span("parse"):
+        if run is None:
+            return [parse_table(page, table_id)]
+        tables = _parse_tables(page, [table_id], run)
+    if table_id not in tables:
+        raise ValueError(f"No tables found matching id '{table_id}'")
+    return [tables[table_id]]
+
+def _read_tables(url, table_ids, ttl, run=None):
+    page = _fetch(url, ttl, run)
+    with metrics.span("parse"):
+        return _parse_tables(page, table_ids, run)
+
+def safe_read_html(url, table_id, ttl=None):
+    """Safely read HTML table with proper error handling.
+
+    The page is fetched through the on-disk page cache, so retries and
+    re-scrapes of an unchanged page don't download it again, and only the
+    requested table is parsed. Inside a fetch run, identical requests share
+    one download, the for/against match logs of a page share one parse, and
+    parsing runs on the process pool (FBREF_PARSE_WORKERS).
+    """
     try:
         check_dependencies()
-        return pd.read_html(url, attrs={'id': table_id})
+        run = current_run()
+        if run is None:
+            return _read_table(url, table_id, ttl)
+
+        if table_id in BUNDLED_TABLE_IDS:
+            tables = run.do(('tables', url),
+                            lambda: _read_tables(url, BUNDLED_TABLE_IDS, ttl, run))
+            if table_id not in tables:
+                raise ValueError(f"No tables found matching id '{table_id}'")
+            return [tables[table_id].copy()]
+
+        tables = run.do(('table', url, table_id),
+                        lambda: _read_table(url, table_id, ttl, run))
+        return [df.copy() for df in tables]
     except ImportError as e:
         logger.error(f"Dependency Error: {e}")
         raise
@@ -45,6 +140,27 @@ def safe_read_html(url, table_id):
         logger.error(f"Error reading HTML table: {e}")
         raise
 
+def safe_read_tables(url, table_ids, ttl=None):
+    """Read several tables (including ones hidden in HTML comments) from one page download.
+
+    Returns a dict of table id to DataFrame for the ids found on the page.
+    """
+    try:
+        check_dependencies()
+        run = current_run()
+        if run is None:
+            return _read_tables(url, table_ids, ttl)
+
+        tables = run.do(('tables', url, tuple(sorted(table_ids))),
+                        lambda: _read_tables(url, table_ids, ttl, run))
+        return {table_id: df.copy() for table_id, df in tables.items()}
+    except ImportError as e:
+        logger.error(f"Dependency Error: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Error reading HTML tables: {e}")
+        raise
+
 def validate_scrape(df, module_name):
     """Basic validation to check if scraping worked"""
     logger = logging.getLogger(module_name)
@@ -57,7 +173,12 @@ def validate_scrape(df, module_name):
     return True
 
 def retry_on_failure(max_retries=3, delay=5):
-    """Decorator to retry failed scraping attempts"""
+    """Decorator to retry failed scraping attempts.
+
+    Only retryable errors (network failures, HTTP 429 and 5xx) are retried,
+    with exponential backoff and jitter starting at `delay` seconds, or the
+    server's Retry-After when it sent one. Anything else fails immediately.
+    """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -73,12 +194,17 @@ def retry_on_failure(max_retries=3, delay=5):
                     raise  # Don't retry if it's a dependency issue
                 except Exception as e:
                     logger.error(f" Attempt {attempt + 1} failed: {str(e)}")
+                    if not is_retryable(e):
+                        logger.error(" Error is not retryable")
+                        raise
                     if attempt < max_retries - 1:
-                        logger.info(f" Waiting {delay} seconds before retrying...")
-                        time.sleep(delay)
+                        metrics.inc("fbref_retries_total", function=func.__name__)
+                        wait = backoff_delay(attempt, delay, e)
+                        logger.info(f" Waiting {wait:.1f} seconds before retrying...")
+                        time.sleep(wait)
                     else:
                         logger.error(" All retry attempts failed")
                         raise
             
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator
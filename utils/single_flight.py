@@ -0,0 +1,82 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from utils import metrics
+
+_current_run = ContextVar("fetch_run", default=None)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Share one execution of a call between every caller asking for the same key.
+
+    Concurrent callers wait for the call already in flight, later callers get
+    the stored result. Failed calls are forgotten so they can be retried, and
+    so are calls made with keep=False once they finish: their result is only
+    shared while in flight, for values too large to hold for a whole run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.hits = 0
+
+    def do(self, key, fn, keep=True):
+        with self._lock:
+            call = self._calls.get(key)
+            owner = call is None
+            if owner:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.hits += 1
+                metrics.inc("fbref_single_flight_hits_total")
+
+        if owner:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                if call.error is not None or not keep:
+                    with self._lock:
+                        self._calls.pop(key, None)
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+def current_run():
+    """Return the SingleFlight of the active fetch run, if any."""
+    return _current_run.get()
+
+
+@contextmanager
+def fetch_run():
+    """Coalesce identical page fetches and table parses for the duration of a run.
+
+    Nested runs reuse the outermost one, so a batch runner can wrap many
+    run_scraper calls in a single scope.
+    """
+    run = _current_run.get()
+    if run is not None:
+        yield run
+        return
+
+    run = SingleFlight()
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
@@ -0,0 +1,143 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# Matches tables in the page markup and inside HTML comments, where FBref hides most of them
+TABLE_PATTERN = re.compile(r'<table\b[^>]*\bid=["\']([^"\']+)["\']')
+
+
+def _table_pattern(table_id):
+    return re.compile(r'<table\b[^>]*\bid=["\']%s["\']' % re.escape(table_id))
+
+
+def _slice_table(page, match):
+    end = page.find('</table>', match.end())
+    if end == -1:
+        return None
+    return page[match.start():end + len('</table>')]
+
+
+def find_table_html(page, table_id):
+    """Slice the markup of a single table out of a page without parsing the rest of it."""
+    match = _table_pattern(table_id).search(page)
+    if not match:
+        return None
+    return _slice_table(page, match)
+
+
+def find_tables_html(page, table_ids):
+    """Slice the markup of every requested table in a single scan of the page."""
+    wanted = set(table_ids)
+    found = {}
+    for match in TABLE_PATTERN.finditer(page):
+        table_id = match.group(1)
+        if table_id in wanted and table_id not in found:
+            table_html = _slice_table(page, match)
+            if table_html is not None:
+                found[table_id] = table_html
+            if len(found) == len(wanted):
+                break
+    return found
+
+
+def _cell_text(cell):
+    return ' '.join(cell.text_content().split())
+
+
+def _expand_row(row):
+    """Return the cell texts of a row, repeating cells that span several columns."""
+    values = []
+    for cell in row.iterchildren('th', 'td'):
+        text = _cell_text(cell)
+        span = int(cell.get('colspan', 1) or 1)
+        values.extend([text] * span)
+    return values
+
+
+def _header_columns(header_rows, n_columns):
+    """Build column labels the same way pd.read_html names them."""
+    levels = []
+    for level, row in enumerate(header_rows):
+        row = row + [''] * (n_columns - len(row))
+        levels.append([
+            text if text else f'Unnamed: {i}_level_{level}'
+            for i, text in enumerate(row[:n_columns])
+        ])
+
+    if not levels:
+        return pd.RangeIndex(n_columns)
+    if len(levels) == 1:
+        return pd.Index(levels[0])
+    return pd.MultiIndex.from_arrays(levels)
+
+
+def _typed_column(values):
+    """Convert a column of cell texts to int64/float64 when every filled cell is numeric.
+
+    Like pd.read_html, only columns written entirely as integers ("12",
+    "1,234") become int64; "100.0", "1e3" or "inf" keep the column float64.
+    """
+    numbers = np.empty(len(values), dtype=np.float64)
+    integral = True
+    for i, text in enumerate(values):
+        if not text:
+            numbers[i] = np.nan
+            integral = False
+            continue
+        text = text.replace(',', '')
+        try:
+            numbers[i] = float(text)
+        except ValueError:
+            return np.array([text if text else np.nan for text in values], dtype=object)
+        if integral and not text.lstrip('+-').isdigit():
+            integral = False
+
+    if integral:
+        return numbers.astype(np.int64)
+    return numbers
+
+
+def table_from_html(table_html):
+    """Parse the markup of one table into a DataFrame with typed columns."""
+    from lxml import html as lxml_html
+
+    table = lxml_html.fragment_fromstring(table_html)
+
+    header_rows = [_expand_row(row) for row in table.xpath('./thead/tr')]
+    body_rows = [_expand_row(row) for row in table.xpath('./tbody/tr | ./tfoot/tr | ./tr')]
+
+    n_columns = max((len(row) for row in header_rows + body_rows), default=0)
+    columns = [[] for _ in range(n_columns)]
+    for row in body_rows:
+        row = row + [''] * (n_columns - len(row))
+        for i in range(n_columns):
+            columns[i].append(row[i])
+
+    data = {i: _typed_column(values) for i, values in enumerate(columns)}
+    df = pd.DataFrame(data, copy=False)
+    df.columns = _header_columns(header_rows, n_columns)
+    return df
+
+
+def parse_table(page, table_id):
+    """Extract the table with the given id from an HTML page.
+
+    Only the matching table is handed to lxml, the rest of the page is skipped.
+    """
+    table_html = find_table_html(page, table_id)
+    if table_html is None:
+        raise ValueError(f"No tables found matching id '{table_id}'")
+    return table_from_html(table_html)
+
+
+def parse_tables(page, table_ids):
+    """Extract several tables (including comment-embedded ones) from one page.
+
+    Returns a dict of table id to DataFrame; ids missing from the page are left out.
+    """
+    return {
+        table_id: table_from_html(table_html)
+        for table_id, table_html in find_tables_html(page, table_ids).items()
+    }
@@ -0,0 +1,188 @@
+import os
+import shutil
+import time
+import uuid
+
+import pandas as pd
+
+from scrapers.schema import normalize_columns
+
+# Incremental appends from update_data are enabled when this is set
+WAREHOUSE_DIR = os.getenv("FBREF_WAREHOUSE_DIR")
+
+PARTITION_KEYS = ("season", "category", "team")
+DATETIME_COLUMNS = {"date", "last_updated"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.fs
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "Missing required dependency: pyarrow. Please install using: pip install pyarrow"
+        )
+    return pyarrow
+
+
+def is_enabled():
+    return bool(WAREHOUSE_DIR)
+
+
+def _partition_dir(root, season, stat_category, team):
+    return os.path.join(root, f"season={season}", f"category={stat_category}", f"team={team}")
+
+
+def stable_frame(df):
+    """Give a match-log frame a schema that is the same for every team and every scrape.
+
+    Columns get their canonical names (also for documents still stored as
+    "For Barcelona_Date"), dates become timestamps, numbers float64 and text
+    strings. Columns with no values at all are left untyped so they don't
+    clash with other part files.
+    """
+    df = normalize_columns(df).rename(columns={"_id": "match_id"})
+    # Partition keys live in the directory names
+    df = df.drop(columns=[column for column in ("row_hash", *PARTITION_KEYS) if column in df.columns])
+
+    for column in df.columns:
+        values = df[column]
+        if column in DATETIME_COLUMNS:
+            df[column] = pd.to_datetime(values, errors="coerce").astype("datetime64[us]")
+        elif values.isna().all():
+            df[column] = pd.Series([None] * len(df), index=df.index, dtype=object)
+        elif pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+            df[column] = values.astype("float64")
+        else:
+            numeric = pd.to_numeric(values.astype(object), errors="coerce")
+            if numeric.notna().sum() == values.notna().sum():
+                df[column] = numeric.astype("float64")
+            else:
+                df[column] = values.astype("string")
+    return df
+
+
+def append_rows(df, season, stat_category, team, root=None):
+    """Write new or changed rows as a new part file of the team's partition."""
+    pa = _pyarrow()
+    root = root or WAREHOUSE_DIR
+    if df is None or df.empty:
+        return None
+
+    directory = _partition_dir(root, season, stat_category, team)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet")
+    table = pa.Table.from_pandas(stable_frame(df), preserve_index=False)
+    pa.parquet.write_table(table, path)
+    return path
+
+
+def write_partition(df, season, stat_category, team, root=None):
+    """Replace a team's partition with a single part file holding `df`."""
+    root = root or WAREHOUSE_DIR
+    directory = _partition_dir(root, season, stat_category, team)
+    shutil.rmtree(directory, ignore_errors=True)
+    return append_rows(df, season, stat_category, team, root)
+
+
+def read_warehouse(root=None, columns=None, **filters):
+    """Read the warehouse into a DataFrame, e.g. read_warehouse(season="2023-2024", category="laliga_shooting").
+
+    Files are memory-mapped and only matching partitions are read. Rows
+    appended several times keep their most recent version.
+    """
+    pa = _pyarrow()
+    root = root or WAREHOUSE_DIR
+    filesystem = pa.fs.LocalFileSystem(use_mmap=True)
+    dataset = pa.dataset.dataset(root, format="parquet", partitioning="hive", filesystem=filesystem)
+    # Part files only differ in columns that were empty when they were written
+    schema = pa.unify_schemas([fragment.physical_schema for fragment in dataset.get_fragments()],
+                              promote_options="permissive")
+    dataset = pa.dataset.dataset(root, format="parquet", partitioning="hive", filesystem=filesystem,
+                                 schema=pa.unify_schemas([schema, dataset.partitioning.schema]))
+
+    expression = None
+    for key, value in filters.items():
+        condition = pa.dataset.field(key) == value
+        expression = condition if expression is None else expression & condition
+
+    if columns is not None:
+        columns = list(dict.fromkeys([*columns, *PARTITION_KEYS, "match_id", "last_updated"]))
+    df = dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    if "match_id" in df.columns:
+        if "last_updated" in df.columns:
+            df = df.sort_values("last_updated", kind="stable")
+        df = df.drop_duplicates(subset=[*PARTITION_KEYS, "match_id"], keep="last")
+    return df.reset_index(drop=True)
+
+
+def sync_from_mongo(season, teams=None, categories=None, root=None, competitions=None):
+    """Export stored match logs of a season into the warehouse, rewriting each partition.
+
+    Defaults to every competition's squads from the squad index and every
+    category, opponent tables included.
+    """
+    import db
+    from scraper import iter_jobs
+    from scrapers.leagues import COMPETITIONS
+
+    competitions = competitions or list(COMPETITIONS)
+    exported = 0
+    for _, team, stat_category in iter_jobs([season], teams, categories, competitions, include_against=True):
+        df = db.load_matchlogs_frame(team, stat_category, season, season)
+        if df is not None:
+            write_partition(df, season, stat_category, team, root)
+            exported += len(df)
+    print(f"✅ Exported {exported} rows for {season} to {root or WAREHOUSE_DIR}")
+    return exported
+
+
+def sync_pending(root=None):
+    """Re-export the partitions whose append from update_data failed, then clear their flag."""
+    import db
+
+    metadata = db.get_metadata_collection()
+    synced = 0
+    for meta in metadata.find({"warehouse_pending": True}):
+        season, team, stat_category = meta["season"], meta["team"], meta["stat_category"]
+        df = db.load_matchlogs_frame(team, stat_category, season, season)
+        if df is not None:
+            write_partition(df, season, stat_category, team, root)
+        metadata.update_one({"_id": meta["_id"]}, {"$set": {"warehouse_pending": False}})
+        synced += 1
+    print(f"✅ Re-exported {synced} pending partitions to {root or WAREHOUSE_DIR}")
+    return synced
+
+
+def compact(root=None):
+    """Merge every partition's part files into one, keeping the latest version of each row."""
+    root = root or WAREHOUSE_DIR
+    df = read_warehouse(root)
+    for (season, stat_category, team), partition in df.groupby(list(PARTITION_KEYS), observed=True):
+        write_partition(partition.drop(columns=list(PARTITION_KEYS)), season, stat_category, team, root)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export stored match logs to the Parquet warehouse.")
+    parser.add_argument("seasons", nargs="*", help="Seasons to export, e.g. 2023-2024")
+    parser.add_argument("--dir", default=WAREHOUSE_DIR or "warehouse", help="Warehouse directory")
+    parser.add_argument("--compact", action="store_true", help="Merge appended part files")
+    parser.add_argument("--pending", action="store_true",
+                        help="Re-export partitions whose append from update_data failed")
+    args = parser.parse_args()
+
+    for season in args.seasons:
+        sync_from_mongo(season, root=args.dir)
+    if args.pending:
+        sync_pending(args.dir)
+    if args.compact:
+        compact(args.dir)
+
+
+if __name__ == "__main__":
+    main()
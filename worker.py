@@ -0,0 +1,10 @@
+from jobs import run_worker
+from utils import metrics
+from utils.logging_config import configure_logging
+
+
+if __name__ == "__main__":
+    configure_logging()
+    print("Starting scrape worker...")
+    metrics.serve()
+    run_worker()